@@ -166,6 +166,9 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
 }
 
+# Cât timp (secunde) este ținut minte rezultatul pozitiv de la /api/token/verify/
+JWT_VERIFY_CACHE_TTL = 5
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -206,5 +209,19 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Pentru dezvo
 # EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 
 DEFAULT_FROM_EMAIL = 'ISS Platform <noreply@issplatform.ro>'
+# Câte facturi se trimit pe aceeași conexiune SMTP la trimiterea în masă
+BILLING_EMAIL_BATCH_SIZE = int(os.getenv('BILLING_EMAIL_BATCH_SIZE', '50'))
+# Câte PDF-uri de factură se descarcă în paralel din SmartBill
+SMARTBILL_PDF_CONCURRENCY = int(os.getenv('SMARTBILL_PDF_CONCURRENCY', '10'))
+# Cât timp (secunde) este ținut în cache raportul sumar de facturare.
+# Fără CACHES configurat se folosește LocMemCache, care e per-proces: invalidarea
+# la modificarea unei facturi are efect doar în procesul curent, iar ceilalți
+# workeri gunicorn pot servi date vechi până la BILLING_REPORT_CACHE_TTL secunde.
+BILLING_REPORT_CACHE_TTL = int(os.getenv('BILLING_REPORT_CACHE_TTL', '45'))
+# Modelul depreciat EcoFinMonthlyReport devine doar-citire (scrierile ridică PermissionDenied,
+# inclusiv ștergerile de lucrători/clienți/utilizatori care ar atinge rapoartele vechi)
+ECOFIN_LEGACY_READONLY = os.getenv('ECOFIN_LEGACY_READONLY', 'False').lower() == 'true'
+# Peste câte rânduri importul Eco-Fin folosește COPY în loc de INSERT-uri multi-rând
+ECOFIN_IMPORT_COPY_THRESHOLD = int(os.getenv('ECOFIN_IMPORT_COPY_THRESHOLD', '20000'))
 ALERT_EMAIL_SUBJECT_PREFIX = '[ISS Platform] '
 DEFAULT_ALERT_EMAIL = os.getenv('DEFAULT_ALERT_EMAIL', 'groseanu@gmail.com')
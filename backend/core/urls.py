@@ -1,12 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
-    TokenVerifyView,
 )
+from iss.views import CachedTokenVerifyView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -14,13 +13,17 @@ urlpatterns = [
     path("api/eco-fin/", include("ecofin.urls")),  # Microserviciu Eco-Fin
     path("api-auth/", include("rest_framework.urls")),
     
-    # JWT Authentication endpoints
-    path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),  # Login
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),  # Refresh
-    path("api/token/verify/", TokenVerifyView.as_view(), name="token_verify"),  # Verifică token
+    # JWT Authentication endpoints (grupate sub un singur prefix)
+    path("api/token/", include([
+        path("", TokenObtainPairView.as_view(), name="token_obtain_pair"),  # Login
+        path("refresh/", TokenRefreshView.as_view(), name="token_refresh"),  # Refresh
+        path("verify/", CachedTokenVerifyView.as_view(), name="token_verify"),  # Verifică token
+    ])),
 ]
 
-# Serve media files in development
+# Serve media files in development (catch-all-ul pentru media rămâne ultimul pattern)
 if settings.DEBUG:
+    from django.conf.urls.static import static
+
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
@@ -2,8 +2,16 @@
 Eco-Fin Admin
 Configurare Django Admin pentru modulul Eco-Fin.
 """
+from functools import lru_cache
+
 from django.contrib import admin
-from django.utils.html import format_html
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+from django.utils.text import smart_split, unescape_string_literal
+from iss.models import Client, Worker
 from .models import (
     EcoFinSettings, 
     EcoFinImportedRow,
@@ -14,10 +22,95 @@ from .models import (
     BillingInvoice,
     BillingInvoiceLine,
     BillingSyncLog,
-    BillingEmailLog
+    BillingEmailLog,
+    result_count_expression,
+    legacy_reports_readonly,
 )
 
 
+_RO_MONTHS = ('', 'Ian', 'Feb', 'Mar', 'Apr', 'Mai', 'Iun',
+              'Iul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_LOCKED_ICON, _UNLOCKED_ICON = '🔒', '📝'
+
+
+@lru_cache(maxsize=256)
+def _period(month, year):
+    """Perioada în format LL/AAAA (puține valori distincte, deci cache)."""
+    return f"{month:02d}/{year}"
+
+
+def _money(value):
+    """Formatează o sumă cu separator de mii și 2 zecimale."""
+    return format(value, ',.2f')
+
+
+@lru_cache(maxsize=None)
+def _admin_change_url_template(viewname):
+    """URL-ul de editare din admin cu %d în locul ID-ului; reverse() rulează o singură dată."""
+    return reverse(viewname, args=[0]).replace('/0/', '/%d/')
+
+
+_BADGE_TEMPLATE = '<span style="color: {}; font-weight: bold;">{}</span>'
+
+
+def _badges(choices, colors, template=_BADGE_TEMPLATE):
+    """
+    Precalculează badge-urile HTML colorate pentru fiecare valoare din choices.
+    Rezultatul depinde doar de status, deci poate fi refolosit pentru toate rândurile.
+    """
+    return {
+        value: format_html(template, colors.get(value, '#000'), label)
+        for value, label in choices
+    }
+
+
+class _SlimChangeList(ChangeList):
+    """ChangeList care aplică list_only_fields / list_defer_fields din ModelAdmin."""
+
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs)
+        if self.model_admin.list_only_fields:
+            queryset = queryset.only(*self.model_admin.list_only_fields)
+        if self.model_admin.list_defer_fields:
+            queryset = queryset.defer(*self.model_admin.list_defer_fields)
+        return queryset
+
+
+class SlimChangeListMixin:
+    """
+    Restrânge coloanele încărcate doar pe pagina de listă.
+    Pagina de editare încarcă în continuare toate câmpurile (fără query-uri pentru câmpuri amânate).
+    """
+    list_only_fields = ()
+    list_defer_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        return _SlimChangeList
+
+
+# Câmpurile folosite de __str__ pentru modelele referite prin FK în formulare
+_FK_ONLY_FIELDS = {
+    Worker: ('id', 'nume', 'prenume', 'pasaport_nr'),
+    Client: ('id', 'denumire'),
+    EcoFinImportBatch: ('id', 'filename', 'year', 'month', 'status'),
+    EcoFinImportedRow: ('id', 'row_number', 'nr_cim', 'nume', 'prenume'),
+}
+
+
+class SlimForeignKeyMixin:
+    """
+    Limitează coloanele încărcate pentru câmpurile FK din formular
+    (validarea raw_id_fields și listele derulante).
+    """
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        only_fields = _FK_ONLY_FIELDS.get(db_field.related_model)
+        if formfield is not None and only_fields:
+            formfield.queryset = formfield.queryset.only(*only_fields)
+        return formfield
+
+
 @admin.register(EcoFinSettings)
 class EcoFinSettingsAdmin(admin.ModelAdmin):
     list_display = (
@@ -28,6 +121,7 @@ class EcoFinSettingsAdmin(admin.ModelAdmin):
     search_fields = ('year',)
     ordering = ('-year', '-month')
     readonly_fields = ('created_at', 'updated_at', 'created_by')
+    list_select_related = ('created_by',)
     
     fieldsets = (
         ('Perioadă', {
@@ -46,18 +140,16 @@ class EcoFinSettingsAdmin(admin.ModelAdmin):
     )
 
     def period_display(self, obj):
-        months = ['', 'Ian', 'Feb', 'Mar', 'Apr', 'Mai', 'Iun', 
-                  'Iul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        icon = '🔒' if obj.is_locked else '📝'
-        return f"{icon} {months[obj.month]} {obj.year}"
+        icon = _LOCKED_ICON if obj.is_locked else _UNLOCKED_ICON
+        return f"{icon} {_RO_MONTHS[obj.month]} {obj.year}"
     period_display.short_description = 'Perioadă'
 
     def cheltuieli_indirecte_display(self, obj):
-        return f"{obj.cheltuieli_indirecte:,.2f} RON"
+        return f"{_money(obj.cheltuieli_indirecte)} RON"
     cheltuieli_indirecte_display.short_description = 'Cheltuieli Ind.'
 
     def cost_concediu_display(self, obj):
-        return f"{obj.cost_concediu:,.2f} RON"
+        return f"{_money(obj.cost_concediu)} RON"
     cost_concediu_display.short_description = 'Cost Concediu'
 
     def save_model(self, request, obj, form, change):
@@ -72,7 +164,7 @@ class EcoFinSettingsAdmin(admin.ModelAdmin):
 
 
 @admin.register(EcoFinImportedRow)
-class EcoFinImportedRowAdmin(admin.ModelAdmin):
+class EcoFinImportedRowAdmin(SlimChangeListMixin, SlimForeignKeyMixin, admin.ModelAdmin):
     list_display = (
         'row_number', 'nr_cim', 'nume', 'prenume',
         'salariu_brut_display', 'ore_lucrate', 'cam_display',
@@ -80,44 +172,67 @@ class EcoFinImportedRowAdmin(admin.ModelAdmin):
     )
     list_filter = ('status', 'year', 'month', 'batch')
     search_fields = ('nr_cim', 'nume', 'prenume', 'worker__nume', 'worker__prenume')
-    ordering = ('-batch__created_at', 'row_number')
+    # batch_id crește odată cu created_at; evităm JOIN-ul pe batch la sortare
+    ordering = ('-batch_id', 'row_number')
     readonly_fields = ('created_at',)
     raw_id_fields = ('worker', 'client', 'batch')
+    list_select_related = ('worker', 'client', 'batch')
+    # Tabel mare: fără COUNT(*) pe tot tabelul și fără "Arată tot" nelimitat
+    show_full_result_count = False
+    list_per_page = 50
+    list_max_show_all = 200
+    list_defer_fields = ('error_message', 'batch__error_details')
+
+    _STATUS_BADGES = _badges(EcoFinImportedRow.Status.choices, {
+        'raw': '#6b7280',
+        'matched': '#10b981',
+        'error': '#ef4444',
+        'processed': '#3b82f6'
+    })
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Aceeași semantică ca search_fields, dar fără JOIN pe lucrător:
+        coloanele proprii folosesc indexurile trigram, iar lucrătorii sunt căutați
+        printr-un subquery pe worker_id, astfel încât OR-ul rămâne indexabil.
+        """
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            workers = Worker.objects.filter(
+                Q(nume__icontains=bit) | Q(prenume__icontains=bit)
+            ).values('pk')
+            queryset = queryset.filter(
+                Q(nr_cim__icontains=bit) | Q(nume__icontains=bit) |
+                Q(prenume__icontains=bit) | Q(worker__in=workers)
+            )
+        return queryset, False
 
     def status_display(self, obj):
-        colors = {
-            'raw': '#6b7280',
-            'matched': '#10b981',
-            'error': '#ef4444',
-            'processed': '#3b82f6'
-        }
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{}</span>',
-            colors.get(obj.status, '#000'),
-            obj.get_status_display()
-        )
+        return self._STATUS_BADGES.get(obj.status, obj.status)
     status_display.short_description = 'Status'
 
     def salariu_brut_display(self, obj):
-        return f"{obj.salariu_brut:,.2f}"
+        return _money(obj.salariu_brut)
     salariu_brut_display.short_description = 'Salariu Brut'
 
     def cam_display(self, obj):
-        return f"{obj.cam:,.2f}"
+        return _money(obj.cam)
     cam_display.short_description = 'CAM'
 
     def worker_link(self, obj):
-        if obj.worker:
-            return format_html(
-                '<a href="/admin/iss/worker/{}/change/">{} {}</a>',
-                obj.worker.id, obj.worker.nume, obj.worker.prenume
-            )
-        return '-'
+        if not obj.worker_id:
+            return '-'
+        worker = obj.worker
+        url = _admin_change_url_template('admin:iss_worker_change') % worker.pk
+        return mark_safe('<a href="%s">%s %s</a>' % (
+            url, escape(worker.nume), escape(worker.prenume)
+        ))
     worker_link.short_description = 'Lucrător'
 
 
 @admin.register(EcoFinProcessedRecord)
-class EcoFinProcessedRecordAdmin(admin.ModelAdmin):
+class EcoFinProcessedRecordAdmin(SlimChangeListMixin, SlimForeignKeyMixin, admin.ModelAdmin):
     list_display = (
         'worker_display', 'client', 'period_display',
         'ore_lucrate', 'salariu_brut_display', 'cam_display',
@@ -136,6 +251,14 @@ class EcoFinProcessedRecordAdmin(admin.ModelAdmin):
         'created_at', 'updated_at', 'validated_at', 'validated_by'
     )
     raw_id_fields = ('worker', 'client', 'imported_row')
+    list_select_related = ('worker', 'client')
+    show_full_result_count = False
+    list_per_page = 50
+    list_only_fields = (
+        'worker__nume', 'worker__prenume', 'client__denumire',
+        'year', 'month', 'ore_lucrate', 'salariu_brut', 'cam',
+        'cost_salariat_total', 'profitabilitate', 'is_validated', 'validated_at'
+    )
     
     fieldsets = (
         ('Identificare', {
@@ -178,27 +301,28 @@ class EcoFinProcessedRecordAdmin(admin.ModelAdmin):
     worker_display.short_description = 'Lucrător'
 
     def period_display(self, obj):
-        return f"{obj.month:02d}/{obj.year}"
+        return _period(obj.month, obj.year)
     period_display.short_description = 'Perioadă'
 
     def salariu_brut_display(self, obj):
-        return f"{obj.salariu_brut:,.2f}"
+        return _money(obj.salariu_brut)
     salariu_brut_display.short_description = 'Salariu Brut'
 
     def cam_display(self, obj):
-        return f"{obj.cam:,.2f}"
+        return _money(obj.cam)
     cam_display.short_description = 'CAM'
 
     def cost_salariat_total_display(self, obj):
-        return f"{obj.cost_salariat_total:,.2f}"
+        return _money(obj.cost_salariat_total)
     cost_salariat_total_display.short_description = 'Cost Total'
 
+    _PROFIT_SPAN = '<span style="color: #10b981; font-weight: bold;">'
+    _LOSS_SPAN = '<span style="color: #ef4444; font-weight: bold;">'
+
     def profitabilitate_display(self, obj):
-        color = '#10b981' if obj.profitabilitate >= 0 else '#ef4444'
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{:,.2f} RON</span>',
-            color, obj.profitabilitate
-        )
+        # Suma formatată conține doar cifre, virgule și punct - nu necesită escape
+        span = self._PROFIT_SPAN if obj.profitabilitate >= 0 else self._LOSS_SPAN
+        return mark_safe(span + _money(obj.profitabilitate) + ' RON</span>')
     profitabilitate_display.short_description = 'Profit'
 
     def has_change_permission(self, request, obj=None):
@@ -213,7 +337,7 @@ class EcoFinProcessedRecordAdmin(admin.ModelAdmin):
 
 
 @admin.register(EcoFinImportBatch)
-class EcoFinImportBatchAdmin(admin.ModelAdmin):
+class EcoFinImportBatchAdmin(SlimChangeListMixin, admin.ModelAdmin):
     list_display = (
         'filename', 'period_display', 'status_display',
         'total_rows', 'matched_rows', 'error_rows', 'processed_rows',
@@ -223,31 +347,30 @@ class EcoFinImportBatchAdmin(admin.ModelAdmin):
     search_fields = ('filename',)
     ordering = ('-created_at',)
     readonly_fields = ('created_at', 'validated_at')
+    list_select_related = ('imported_by',)
+    list_defer_fields = ('error_details',)
 
     def period_display(self, obj):
-        return f"{obj.month:02d}/{obj.year}"
+        return _period(obj.month, obj.year)
     period_display.short_description = 'Perioadă'
 
+    _STATUS_BADGES = _badges(EcoFinImportBatch.Status.choices, {
+        'pending': '#6b7280',
+        'processing': '#f59e0b',
+        'preview': '#3b82f6',
+        'validated': '#10b981',
+        'failed': '#ef4444',
+        'cancelled': '#9ca3af'
+    })
+
     def status_display(self, obj):
-        colors = {
-            'pending': '#6b7280',
-            'processing': '#f59e0b',
-            'preview': '#3b82f6',
-            'validated': '#10b981',
-            'failed': '#ef4444',
-            'cancelled': '#9ca3af'
-        }
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{}</span>',
-            colors.get(obj.status, '#000'),
-            obj.get_status_display()
-        )
+        return self._STATUS_BADGES.get(obj.status, obj.status)
     status_display.short_description = 'Status'
 
 
 # Compatibilitate cu modelul vechi
 @admin.register(EcoFinMonthlyReport)
-class EcoFinMonthlyReportAdmin(admin.ModelAdmin):
+class EcoFinMonthlyReportAdmin(SlimForeignKeyMixin, admin.ModelAdmin):
     list_display = (
         'worker', 'client', 'year', 'month', 
         'hours_worked', 'salary_cost', 'profit_brut', 
@@ -257,13 +380,21 @@ class EcoFinMonthlyReportAdmin(admin.ModelAdmin):
     search_fields = ('worker__nume', 'worker__prenume', 'worker__pasaport_nr', 'client__denumire')
     ordering = ('-year', '-month', 'worker__nume')
     readonly_fields = ('profit_brut', 'created_at', 'updated_at')
-    
+    list_select_related = ('worker', 'client')
+
+    def has_add_permission(self, request):
+        return not legacy_reports_readonly()
+
     def has_change_permission(self, request, obj=None):
+        if legacy_reports_readonly():
+            return False
         if obj and obj.is_validated:
             return request.user.is_superuser
         return True
 
     def has_delete_permission(self, request, obj=None):
+        if legacy_reports_readonly():
+            return False
         if obj and obj.is_validated:
             return request.user.is_superuser
         return True
@@ -277,10 +408,15 @@ class BillingInvoiceLineInline(admin.TabularInline):
     model = BillingInvoiceLine
     extra = 0
     readonly_fields = ('line_total', 'line_vat')
+    show_change_link = False
+
+    def get_queryset(self, request):
+        # Formset-ul filtrează după factura părinte; o aducem în același query
+        return super().get_queryset(request).select_related('invoice')
 
 
 @admin.register(BillingInvoice)
-class BillingInvoiceAdmin(admin.ModelAdmin):
+class BillingInvoiceAdmin(SlimChangeListMixin, SlimForeignKeyMixin, admin.ModelAdmin):
     list_display = (
         'invoice_number_display', 'client', 'period_display',
         'subtotal_display', 'vat_total_display', 'total_display',
@@ -300,6 +436,10 @@ class BillingInvoiceAdmin(admin.ModelAdmin):
         'last_email_sent_at', 'email_sent_to', 'email_sent_count'
     )
     raw_id_fields = ('client',)
+    list_select_related = ('client',)
+    show_full_result_count = False
+    list_per_page = 50
+    list_defer_fields = ('pdf_path', 'email_sent_to')
     inlines = [BillingInvoiceLineInline]
     
     fieldsets = (
@@ -330,57 +470,51 @@ class BillingInvoiceAdmin(admin.ModelAdmin):
     )
 
     def period_display(self, obj):
-        return f"{obj.month:02d}/{obj.year}"
+        return _period(obj.month, obj.year)
     period_display.short_description = 'Perioadă'
 
     def subtotal_display(self, obj):
-        return f"{obj.subtotal:,.2f}"
+        return _money(obj.subtotal)
     subtotal_display.short_description = 'Fără TVA'
 
     def vat_total_display(self, obj):
-        return f"{obj.vat_total:,.2f}"
+        return _money(obj.vat_total)
     vat_total_display.short_description = 'TVA'
 
     def total_display(self, obj):
-        return f"{obj.total:,.2f}"
+        return _money(obj.total)
     total_display.short_description = 'Total'
 
     def paid_display(self, obj):
-        return f"{obj.paid_amount:,.2f}"
+        return _money(obj.paid_amount)
     paid_display.short_description = 'Încasat'
 
+    _DUE_SPAN = '<span style="color: #ef4444;">'
+    _SETTLED_SPAN = '<span style="color: #10b981;">'
+
     def due_display(self, obj):
-        color = '#ef4444' if obj.due_amount > 0 else '#10b981'
-        return format_html(
-            '<span style="color: {};">{:,.2f}</span>',
-            color, obj.due_amount
-        )
+        span = self._DUE_SPAN if obj.due_amount > 0 else self._SETTLED_SPAN
+        return mark_safe(span + _money(obj.due_amount) + '</span>')
     due_display.short_description = 'Sold'
 
+    _STATUS_BADGES = _badges(BillingInvoice.InvoiceStatus.choices, {
+        'draft': '#6b7280',
+        'issued': '#10b981',
+        'cancelled': '#ef4444'
+    })
+
     def status_display(self, obj):
-        colors = {
-            'draft': '#6b7280',
-            'issued': '#10b981',
-            'cancelled': '#ef4444'
-        }
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{}</span>',
-            colors.get(obj.status, '#000'),
-            obj.get_status_display()
-        )
+        return self._STATUS_BADGES.get(obj.status, obj.status)
     status_display.short_description = 'Status'
 
+    _PAYMENT_STATUS_BADGES = _badges(BillingInvoice.PaymentStatus.choices, {
+        'unpaid': '#ef4444',
+        'partial': '#f59e0b',
+        'paid': '#10b981'
+    })
+
     def payment_status_display(self, obj):
-        colors = {
-            'unpaid': '#ef4444',
-            'partial': '#f59e0b',
-            'paid': '#10b981'
-        }
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{}</span>',
-            colors.get(obj.payment_status, '#000'),
-            obj.get_payment_status_display()
-        )
+        return self._PAYMENT_STATUS_BADGES.get(obj.payment_status, obj.payment_status)
     payment_status_display.short_description = 'Încasare'
 
     def save_model(self, request, obj, form, change):
@@ -402,7 +536,7 @@ class BillingInvoiceAdmin(admin.ModelAdmin):
 
 
 @admin.register(BillingSyncLog)
-class BillingSyncLogAdmin(admin.ModelAdmin):
+class BillingSyncLogAdmin(SlimChangeListMixin, admin.ModelAdmin):
     list_display = (
         'sync_started_at', 'sync_finished_at',
         'status_display', 'user',
@@ -411,34 +545,42 @@ class BillingSyncLogAdmin(admin.ModelAdmin):
     )
     list_filter = ('status',)
     ordering = ('-sync_started_at',)
+    list_select_related = ('user',)
+    # result_counts este citit prin adnotări (vezi get_queryset)
+    list_defer_fields = ('result_counts', 'error_message')
     readonly_fields = (
         'sync_started_at', 'sync_finished_at',
         'requested_from_ts', 'requested_to_ts',
         'user', 'status', 'result_counts', 'error_message'
     )
 
+    _STATUS_BADGES = _badges(BillingSyncLog.Status.choices, {
+        'in_progress': '#f59e0b',
+        'success': '#10b981',
+        'failure': '#ef4444'
+    })
+
     def status_display(self, obj):
-        colors = {
-            'in_progress': '#f59e0b',
-            'success': '#10b981',
-            'failure': '#ef4444'
-        }
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{}</span>',
-            colors.get(obj.status, '#000'),
-            obj.get_status_display()
-        )
+        return self._STATUS_BADGES.get(obj.status, obj.status)
     status_display.short_description = 'Status'
 
+    def get_queryset(self, request):
+        # Cheile din result_counts sunt extrase direct în SQL
+        return super().get_queryset(request).annotate(
+            _invoices_updated=result_count_expression('invoices_updated'),
+            _errors_count=result_count_expression('errors_count'),
+        )
+
     def results_summary(self, obj):
-        if obj.result_counts:
-            return f"Actualizate: {obj.result_counts.get('invoices_updated', 0)}, Erori: {obj.result_counts.get('errors_count', 0)}"
-        return '-'
+        if obj._invoices_updated is None and obj._errors_count is None:
+            return '-'
+        return f"Actualizate: {obj._invoices_updated or 0}, Erori: {obj._errors_count or 0}"
     results_summary.short_description = 'Rezultate'
+    results_summary.admin_order_field = '_invoices_updated'
 
 
 @admin.register(BillingEmailLog)
-class BillingEmailLogAdmin(admin.ModelAdmin):
+class BillingEmailLogAdmin(SlimChangeListMixin, admin.ModelAdmin):
     list_display = (
         'sent_at', 'invoice', 'sent_to', 'sent_by', 'status_display'
     )
@@ -448,11 +590,18 @@ class BillingEmailLogAdmin(admin.ModelAdmin):
     readonly_fields = (
         'sent_at', 'sent_by', 'invoice', 'sent_to', 'subject', 'status', 'error_message'
     )
+    # __str__ al facturii afișează și clientul
+    list_select_related = ('invoice__client', 'sent_by')
+    show_full_result_count = False
+    list_per_page = 50
+    list_defer_fields = ('subject', 'error_message', 'invoice__pdf_path')
+
+    _STATUS_BADGES = _badges(
+        BillingEmailLog._meta.get_field('status').choices,
+        {'sent': '#10b981', 'failed': '#ef4444'},
+        template='<span style="color: {};">{}</span>'
+    )
 
     def status_display(self, obj):
-        color = '#10b981' if obj.status == 'sent' else '#ef4444'
-        return format_html(
-            '<span style="color: {};">{}</span>',
-            color, 'Trimis' if obj.status == 'sent' else 'Eșuat'
-        )
+        return self._STATUS_BADGES.get(obj.status, self._STATUS_BADGES['failed'])
     status_display.short_description = 'Status'
@@ -6,3 +6,7 @@ class EcofinConfig(AppConfig):
     name = 'ecofin'
     verbose_name = 'Eco-Fin (Profitabilitate)'
 
+    def ready(self):
+        """Încarcă signals când app-ul e gata."""
+        import ecofin.signals  # noqa: F401
+
@@ -2,22 +2,46 @@
 Eco-Fin Billing Views
 API endpoints pentru facturare SmartBill.
 """
+import csv
+import hashlib
+import itertools
+import json
+import logging
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from decimal import Decimal
-from io import BytesIO
 
 from django.conf import settings
-from django.core.mail import EmailMessage
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
 from django.db import transaction
-from django.db.models import Sum, Q
-from django.http import HttpResponse, FileResponse
+from django.db.models import Count, DecimalField, Max, Sum, Q, Value
+from django.db.models.functions import Coalesce, Length
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils import timezone
 
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
+
+# Pentru export PDF
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
 
 from iss.models import Client
 from .models import (
@@ -32,10 +56,12 @@ from .serializers import (
     BillingInvoiceListSerializer,
     BillingInvoiceLineSerializer,
     BillingSyncLogSerializer,
+    BillingSyncLogSummarySerializer,
     BillingEmailLogSerializer,
     IssueInvoiceRequestSerializer,
     InvoicePreviewSerializer,
     SendEmailRequestSerializer,
+    SendBulkEmailRequestSerializer,
     BillingReportFilterSerializer
 )
 from .smartbill_client import (
@@ -44,15 +70,254 @@ from .smartbill_client import (
     get_smartbill_client,
     is_smartbill_configured
 )
+from .cache import billing_report_cache_version, invalidate_billing_reports
+
+
+logger = logging.getLogger(__name__)
+
 
+# Tipul liniilor de factură în funcție de modul de emitere
+_LINE_TYPE_BY_MODE = {
+    'standard': 'standard',
+    'difference': 'difference',
+    'extra_services': 'extra',
+}
 
-# Mapping pentru numele lunilor în română
-MONTH_NAMES_RO = {
-    1: 'IANUARIE', 2: 'FEBRUARIE', 3: 'MARTIE', 4: 'APRILIE',
-    5: 'MAI', 6: 'IUNIE', 7: 'IULIE', 8: 'AUGUST',
-    9: 'SEPTEMBRIE', 10: 'OCTOMBRIE', 11: 'NOIEMBRIE', 12: 'DECEMBRIE'
+# Etichetele statusurilor de plată în exporturi
+_PAYMENT_STATUS_LABELS = {
+    'paid': 'Încasată',
+    'partial': 'Parțial',
+    'unpaid': 'Neîncasată',
 }
 
+# Coloanele citite pentru exporturile Excel/PDF (tupluri, fără modele);
+# ordinea e cea în care rândurile sunt despachetate în bucla de export
+_EXPORT_FIELDS = (
+    'client__denumire', 'smartbill_series', 'smartbill_number', 'issue_date',
+    'month', 'year', 'subtotal', 'vat_total', 'total', 'paid_amount',
+    'due_amount', 'payment_status',
+)
+
+# Rânduri citite odată la exporturi; pe PostgreSQL iterator() folosește un
+# cursor server-side, deci memoria rămâne O(chunk) indiferent de nr. facturi
+_EXPORT_CHUNK_SIZE = 2000
+
+# Lățimile coloanelor (cm) din exportul PDF; totalul = lățimea utilă A4 landscape
+_PDF_EXPORT_COL_WIDTHS = (1.2, 4.5, 2.8, 2.4, 2.0, 2.5, 2.3, 2.5, 2.5, 2.5, 2.5)
+
+# Lățimile coloanelor din exportul Excel (A-L); Client se ajustează la date
+_EXCEL_EXPORT_WIDTHS = (6, 30, 14, 14, 6, 6, 17, 12, 12, 12, 12, 12)
+
+# Capul de tabel pentru exporturile Excel/CSV, respectiv PDF
+_EXPORT_HEADERS = (
+    'Nr.', 'Client', 'Serie/Număr', 'Data emiterii',
+    'Luna', 'An', 'Valoare fără TVA', 'TVA', 'Total',
+    'Încasat', 'Sold', 'Status'
+)
+_PDF_EXPORT_HEADERS = (
+    'Nr.', 'Client', 'Serie/Nr.', 'Data',
+    'Luna/An', 'Fără TVA', 'TVA', 'Total',
+    'Încasat', 'Sold', 'Status'
+)
+
+# Stilurile exporturilor, construite o singură dată la încărcarea modulului
+_EXCEL_HEADER_FONT = Font(bold=True, color='FFFFFF')
+_EXCEL_HEADER_FILL = PatternFill(start_color='1E40AF', end_color='1E40AF', fill_type='solid')
+_EXCEL_HEADER_ALIGNMENT = Alignment(horizontal='center')
+
+if HAS_REPORTLAB:
+    _PDF_TITLE_STYLE = ParagraphStyle(
+        'Title',
+        parent=getSampleStyleSheet()['Heading1'],
+        fontSize=16,
+        alignment=1
+    )
+    _PDF_TABLE_STYLE = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e1')),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f1f5f9')])
+    ])
+
+# Constante Decimal folosite la calculul facturilor
+_ZERO = Decimal('0')
+_HUNDRED = Decimal('100')
+_VAT_RATE = Decimal('21')
+_VAT_FRACTION = _VAT_RATE / _HUNDRED
+
+# Numele lunilor în română, indexat direct după numărul lunii (1-12)
+MONTH_NAMES_RO = (
+    '', 'IANUARIE', 'FEBRUARIE', 'MARTIE', 'APRILIE', 'MAI', 'IUNIE',
+    'IULIE', 'AUGUST', 'SEPTEMBRIE', 'OCTOMBRIE', 'NOIEMBRIE', 'DECEMBRIE'
+)
+
+
+def _last_months_q(months_back, today=None):
+    """
+    Filtru pentru ultimele N luni calendaristice (inclusiv luna curentă),
+    exprimat ca interval pe (year, month) - indexabil, fără OR pe fiecare lună.
+    """
+    if today is None:
+        today = timezone.now().date()
+    to_year, to_month = today.year, today.month
+    from_year, from_month = divmod(to_year * 12 + to_month - 1 - (months_back - 1), 12)
+    from_month += 1
+
+    if from_year == to_year:
+        return Q(year=to_year, month__gte=from_month, month__lte=to_month)
+    return (
+        Q(year=from_year, month__gte=from_month) |
+        Q(year__gt=from_year, year__lt=to_year) |
+        Q(year=to_year, month__lte=to_month)
+    )
+
+
+# Coloanele scrise la finalul unei sincronizări
+_SYNC_LOG_RESULT_FIELDS = ('sync_finished_at', 'status', 'result_counts', 'error_message')
+
+# Coloanele citite pentru ?summary=1 la sync-logs
+_SYNC_LOG_SUMMARY_FIELDS = (
+    'id', 'sync_started_at', 'sync_finished_at', 'status', 'result_counts',
+    'user__username',
+)
+
+
+def _issued_invoices(filters):
+    """Facturile emise, cu filtrele comune pentru raportul sumar și exporturi."""
+    queryset = BillingInvoice.objects.filter(
+        status=BillingInvoice.InvoiceStatus.ISSUED
+    )
+    if filters.get('year'):
+        queryset = queryset.filter(year=filters['year'])
+    if filters.get('month'):
+        queryset = queryset.filter(month=filters['month'])
+    if filters.get('client_id'):
+        queryset = queryset.filter(client_id=filters['client_id'])
+    if filters.get('payment_status') and filters['payment_status'] != 'all':
+        queryset = queryset.filter(payment_status=filters['payment_status'])
+    if filters.get('last_months', 0) > 0:
+        queryset = queryset.filter(_last_months_q(filters['last_months']))
+    return queryset
+
+
+def _sum_or_zero(field):
+    """Sum(field) care întoarce Decimal('0') în loc de None pentru seturi goale."""
+    return Coalesce(Sum(field), Value(_ZERO), output_field=DecimalField())
+
+
+def _save_invoice_pdf(smartbill, client_id, year, month, series, number):
+    """
+    Descarcă PDF-ul facturii din SmartBill direct pe disc (în bucăți).
+    Returnează calea relativă la MEDIA_ROOT; la eroare șterge fișierul parțial.
+    """
+    relative_dir = os.path.join('invoices', str(client_id), str(year), str(month))
+    pdf_dir = os.path.join(settings.MEDIA_ROOT, relative_dir)
+    os.makedirs(pdf_dir, exist_ok=True)
+    
+    pdf_filename = f"{series}{number}.pdf"
+    pdf_path = os.path.join(pdf_dir, pdf_filename)
+    
+    try:
+        with open(pdf_path, 'wb') as f:
+            for chunk in smartbill.iter_invoice_pdf(series=series, number=number):
+                f.write(chunk)
+    except SmartBillError:
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        raise
+    
+    return os.path.join(relative_dir, pdf_filename)
+
+
+def _fetch_missing_pdfs(smartbill, invoices):
+    """
+    Descarcă în paralel PDF-urile lipsă (emise în SmartBill, fără pdf_path).
+    Fiecare fir folosește propria sesiune keep-alive a clientului; căile se
+    salvează într-un singur bulk_update. Facturile eșuate rămân fără PDF.
+    """
+    missing = [
+        invoice for invoice in invoices
+        if not invoice.pdf_path and invoice.smartbill_series and invoice.smartbill_number
+    ]
+    if not smartbill or not missing:
+        return
+
+    def fetch(invoice):
+        try:
+            return _save_invoice_pdf(
+                smartbill, invoice.client_id, invoice.year, invoice.month,
+                invoice.smartbill_series, invoice.smartbill_number
+            )
+        except SmartBillError:
+            return ''
+
+    max_workers = settings.SMARTBILL_PDF_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+        paths = list(executor.map(fetch, missing))
+
+    fetched = []
+    for invoice, pdf_path in zip(missing, paths):
+        if pdf_path:
+            invoice.pdf_path = pdf_path
+            fetched.append(invoice)
+    BillingInvoice.objects.bulk_update(fetched, ['pdf_path'], batch_size=200)
+
+
+def _export_invoice_number(series, number):
+    """Serie + număr pentru un rând de export (ca invoice_number_display)."""
+    if series and number:
+        return f"{series}{number}"
+    return "DRAFT"
+
+
+def _export_spool():
+    """Fișier temporar pentru exporturi: în memorie până la 8 MB, apoi pe disc."""
+    return tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+
+
+def _export_file_response(export_file, content_type, filename):
+    """Trimite un export deja scris ca download, în bucăți de 64 KB."""
+    export_file.seek(0)
+    response = FileResponse(
+        export_file,
+        content_type=content_type,
+        as_attachment=True,
+        filename=filename
+    )
+    response.block_size = 64 * 1024
+    return response
+
+
+class _Echo:
+    """Pseudo-fișier pentru csv.writer: writerow() întoarce linia formatată."""
+    def write(self, value):
+        return value
+
+
+def _invoice_email_content(invoice):
+    """Subiectul și corpul email-ului cu factura."""
+    month_name = MONTH_NAMES_RO[invoice.month]
+    subject = f'Factura {invoice.invoice_number_display} – {invoice.client.denumire} – {month_name}/{invoice.year}'
+    
+    body = f"""Bună ziua,
+
+Vă trimitem atașat factura {invoice.invoice_number_display} pentru serviciile prestate în luna {month_name} {invoice.year}.
+
+Detalii factură:
+- Valoare fără TVA: {invoice.subtotal} RON
+- TVA: {invoice.vat_total} RON
+- Total: {invoice.total} RON
+
+Cu respect,
+International Staff Sourcing SRL
+"""
+    return subject, body
+
 
 class IsManagementOrAdmin:
     """
@@ -79,6 +344,7 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
     - POST /api/eco-fin/billing/invoices/issue/ - Emite factură
     - GET /api/eco-fin/billing/invoices/{id}/pdf/ - Descarcă PDF
     - POST /api/eco-fin/billing/invoices/{id}/send-email/ - Trimite email
+    - POST /api/eco-fin/billing/invoices/send-bulk/ - Trimite mai multe facturi pe email
     """
     queryset = BillingInvoice.objects.all()
     serializer_class = BillingInvoiceSerializer
@@ -108,15 +374,18 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
         if payment_status and payment_status != 'all':
             queryset = queryset.filter(payment_status=payment_status)
         
-        # Filtru ultimele N luni
+        # Filtru ultimele N luni (0 = fără filtru); valoare invalidă -> 400
         if last_months:
-            today = datetime.now()
-            months_back = int(last_months)
-            date_filters = Q()
-            for i in range(months_back):
-                target_date = today - timedelta(days=30 * i)
-                date_filters |= Q(year=target_date.year, month=target_date.month)
-            queryset = queryset.filter(date_filters)
+            try:
+                last_months = BillingReportFilterSerializer().fields['last_months'].run_validation(last_months)
+            except ValidationError as e:
+                raise ValidationError({'last_months': e.detail})
+            if last_months > 0:
+                queryset = queryset.filter(_last_months_q(last_months))
+        
+        # Liniile sunt serializate doar în detaliu (lista folosește serializer-ul fără linii)
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            queryset = queryset.prefetch_related('lines')
         
         return queryset.order_by('-year', '-month', '-issue_date')
     
@@ -157,8 +426,24 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            client = Client.objects.get(id=client_id)
-        except Client.DoesNotExist:
+            year, month = int(year), int(month)
+        except (TypeError, ValueError):
+            return Response(
+                {'detail': 'year și month trebuie să fie numere întregi'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= month <= 12:
+            return Response(
+                {'detail': 'month trebuie să fie între 1 și 12'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        month_name = MONTH_NAMES_RO[month]
+        
+        # Doar coloanele folosite în preview, fără instanțiere de model
+        client = Client.objects.filter(id=client_id).values(
+            'id', 'denumire', 'tarif_orar'
+        ).first()
+        if client is None:
             return Response(
                 {'detail': 'Clientul nu a fost găsit'},
                 status=status.HTTP_404_NOT_FOUND
@@ -166,43 +451,46 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
         
         # Obține orele din EcoFinProcessedRecord
         records = EcoFinProcessedRecord.objects.filter(
-            client=client,
+            client_id=client['id'],
             year=year,
             month=month
         )
         
-        total_hours = records.aggregate(Sum('ore_lucrate'))['ore_lucrate__sum'] or Decimal('0')
-        hourly_rate = getattr(client, 'tarif_orar', Decimal('0')) or Decimal('0')
+        total_hours = records.aggregate(total=_sum_or_zero('ore_lucrate'))['total']
+        hourly_rate = client['tarif_orar'] or _ZERO
         
         # Calculează valoarea
         subtotal = total_hours * hourly_rate
-        vat_rate = Decimal('21')
-        vat_total = subtotal * (vat_rate / 100)
+        vat_rate = _VAT_RATE
+        vat_total = subtotal * _VAT_FRACTION
         total = subtotal + vat_total
         
-        # Verifică facturi existente pentru aceeași lună
-        existing_invoices = BillingInvoice.objects.filter(
-            client=client,
+        # Verifică facturi existente pentru aceeași lună (un singur query)
+        existing_invoices = list(BillingInvoice.objects.filter(
+            client_id=client['id'],
             year=year,
             month=month,
             status=BillingInvoice.InvoiceStatus.ISSUED
-        )
+        ).only(
+            'id', 'smartbill_series', 'smartbill_number',
+            'subtotal', 'total', 'issue_date'
+        ))
         
-        already_billed = existing_invoices.aggregate(Sum('subtotal'))['subtotal__sum'] or Decimal('0')
+        already_billed = sum((inv.subtotal for inv in existing_invoices), _ZERO)
         
         warnings = []
         
-        if existing_invoices.exists():
+        if existing_invoices:
             if already_billed >= subtotal:
                 warnings.append(
-                    f'Există deja factură/facturi pentru {MONTH_NAMES_RO[int(month)]} {year} '
+                    f'Există deja factură/facturi pentru {month_name} {year} '
                     f'cu valoare totală {already_billed} RON (≥ {subtotal} RON calculat). '
                     f'Doriți să facturați alte servicii?'
                 )
             else:
                 difference = subtotal - already_billed
                 warnings.append(
-                    f'Există factură/facturi pentru {MONTH_NAMES_RO[int(month)]} {year} '
+                    f'Există factură/facturi pentru {month_name} {year} '
                     f'cu valoare {already_billed} RON. Diferență de facturat: {difference} RON.'
                 )
         
@@ -213,43 +501,43 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
             warnings.append('Tariful orar pentru client este 0!')
         
         # Construiește liniile
-        month_name = MONTH_NAMES_RO.get(int(month), str(month))
         lines = [{
             'description': f'PRESTARI SERVICII {month_name} {year}',
             'quantity': 1,
-            'unit_price': float(subtotal),
-            'vat_rate': float(vat_rate),
-            'line_total': float(subtotal),
-            'line_vat': float(vat_total)
+            'unit_price': subtotal,
+            'vat_rate': vat_rate,
+            'line_total': subtotal,
+            'line_vat': vat_total
         }]
         
         existing_list = [{
             'id': inv.id,
             'series_number': inv.invoice_number_display,
-            'subtotal': float(inv.subtotal),
-            'total': float(inv.total),
+            'subtotal': inv.subtotal,
+            'total': inv.total,
             'issue_date': inv.issue_date.isoformat() if inv.issue_date else None
         } for inv in existing_invoices]
         
         preview_data = {
-            'client_id': client.id,
-            'client_name': client.denumire,
-            'year': int(year),
-            'month': int(month),
+            'client_id': client['id'],
+            'client_name': client['denumire'],
+            'year': year,
+            'month': month,
             'month_name': month_name,
-            'total_hours': float(total_hours),
-            'hourly_rate': float(hourly_rate),
+            'total_hours': total_hours,
+            'hourly_rate': hourly_rate,
             'lines': lines,
-            'subtotal': float(subtotal),
-            'vat_rate': float(vat_rate),
-            'vat_total': float(vat_total),
-            'total': float(total),
+            'subtotal': subtotal,
+            'vat_rate': vat_rate,
+            'vat_total': vat_total,
+            'total': total,
             'existing_invoices': existing_list,
-            'already_billed_amount': float(already_billed),
+            'already_billed_amount': already_billed,
             'warnings': warnings
         }
         
-        return Response(preview_data)
+        # Valorile rămân Decimal; serializer-ul le rotunjește la 2 zecimale
+        return Response(InvoicePreviewSerializer(preview_data).data)
     
     @action(detail=False, methods=['post'], url_path='issue')
     def issue_invoice(self, request):
@@ -287,7 +575,10 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            client = Client.objects.get(id=data['client_id'])
+            # Instanța e necesară pentru relația cu factura; doar coloanele folosite
+            client = Client.objects.only(
+                'id', 'denumire', 'cod_fiscal', 'adresa', 'oras', 'judet', 'tarif_orar'
+            ).get(id=data['client_id'])
         except Client.DoesNotExist:
             return Response(
                 {'detail': 'Clientul nu a fost găsit'},
@@ -303,8 +594,8 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
             client=client, year=year, month=month
         )
         
-        total_hours = records.aggregate(Sum('ore_lucrate'))['ore_lucrate__sum'] or Decimal('0')
-        hourly_rate = getattr(client, 'tarif_orar', Decimal('0')) or Decimal('0')
+        total_hours = records.aggregate(total=_sum_or_zero('ore_lucrate'))['total']
+        hourly_rate = client.tarif_orar or _ZERO
         subtotal = total_hours * hourly_rate
         
         # Verifică facturi existente
@@ -312,12 +603,12 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
             client=client, year=year, month=month,
             status=BillingInvoice.InvoiceStatus.ISSUED
         )
-        already_billed = existing_invoices.aggregate(Sum('subtotal'))['subtotal__sum'] or Decimal('0')
+        already_billed = existing_invoices.aggregate(total=_sum_or_zero('subtotal'))['total']
         
         # Construiește liniile în funcție de mod
-        month_name = MONTH_NAMES_RO.get(month, str(month))
+        month_name = MONTH_NAMES_RO[month]
         lines = []
-        vat_rate = Decimal('21')
+        vat_rate = _VAT_RATE
         
         if mode == 'standard':
             # Factură standard pentru servicii complete
@@ -354,7 +645,7 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
                     {'detail': 'Pentru modul extra_services, trebuie să furnizați extra_lines.'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            subtotal = Decimal('0')
+            subtotal = _ZERO
             for extra in extra_lines:
                 line_subtotal = Decimal(str(extra.get('quantity', 1))) * Decimal(str(extra.get('unit_price', 0)))
                 lines.append({
@@ -367,28 +658,31 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
                 subtotal += line_subtotal
         
         # Calculează totalurile
-        vat_total = subtotal * (vat_rate / 100)
+        vat_total = subtotal * _VAT_FRACTION
         total = subtotal + vat_total
         
         # Pregătește datele clientului pentru SmartBill
         client_data = {
             'name': client.denumire,
-            'cif': getattr(client, 'cif', ''),
-            'address': getattr(client, 'adresa', ''),
-            'city': getattr(client, 'oras', ''),
-            'county': getattr(client, 'judet', ''),
+            'cif': client.cod_fiscal,
+            'address': client.adresa,
+            'city': client.oras,
+            'county': client.judet,
             'country': 'România',
-            'email': getattr(client, 'email', ''),
+            'email': '',
             'is_tax_payer': True
         }
         
+        # Data emiterii, calculată o singură dată (aware, în fusul orar local)
+        issue_dt = timezone.localtime()
+        
         try:
             with transaction.atomic():
                 # Emite factura în SmartBill
                 result = smartbill.issue_invoice(
                     client_data=client_data,
                     lines=lines,
-                    issue_date=datetime.now()
+                    issue_date=issue_dt
                 )
                 
                 # Creează înregistrarea în BD
@@ -398,67 +692,53 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
                     month=month,
                     smartbill_series=result.get('series', ''),
                     smartbill_number=result.get('number', ''),
-                    issue_date=datetime.now().date(),
+                    issue_date=issue_dt.date(),
                     subtotal=subtotal,
                     vat_total=vat_total,
                     total=total,
-                    hours_billed=total_hours if mode == 'standard' else Decimal('0'),
+                    hours_billed=total_hours if mode == 'standard' else _ZERO,
                     hourly_rate=hourly_rate,
                     status=BillingInvoice.InvoiceStatus.ISSUED,
                     created_by=request.user
                 )
                 
-                # Salvează liniile
-                for i, line in enumerate(lines):
-                    line_total = Decimal(str(line['quantity'])) * Decimal(str(line['price']))
-                    line_vat = line_total * (Decimal(str(line['vatPercent'])) / 100)
-                    BillingInvoiceLine.objects.create(
-                        invoice=invoice,
+                # Salvează liniile (un singur INSERT)
+                line_type = _LINE_TYPE_BY_MODE[mode]
+                invoice_lines = [
+                    BillingInvoiceLine.build(
+                        invoice,
                         description=line['name'],
                         quantity=Decimal(str(line['quantity'])),
                         unit_price=Decimal(str(line['price'])),
                         vat_rate=Decimal(str(line['vatPercent'])),
-                        line_total=line_total,
-                        line_vat=line_vat,
-                        line_type='standard' if mode == 'standard' else 
-                                 ('difference' if mode == 'difference' else 'extra')
-                    )
-                
-                # Descarcă și salvează PDF-ul
-                try:
-                    pdf_content = smartbill.get_invoice_pdf(
-                        series=result.get('series', ''),
-                        number=result.get('number', '')
-                    )
-                    
-                    # Salvează PDF-ul
-                    pdf_dir = os.path.join(
-                        settings.MEDIA_ROOT, 'invoices', 
-                        str(client.id), str(year), str(month)
-                    )
-                    os.makedirs(pdf_dir, exist_ok=True)
-                    
-                    pdf_filename = f"{result.get('series', '')}{result.get('number', '')}.pdf"
-                    pdf_path = os.path.join(pdf_dir, pdf_filename)
-                    
-                    with open(pdf_path, 'wb') as f:
-                        f.write(pdf_content)
-                    
-                    invoice.pdf_path = os.path.join(
-                        'invoices', str(client.id), str(year), str(month), pdf_filename
+                        line_type=line_type
                     )
-                    invoice.save()
-                    
-                except SmartBillError as e:
-                    # PDF-ul nu a putut fi descărcat, dar factura a fost emisă
-                    pass
+                    for line in lines
+                ]
+                BillingInvoiceLine.objects.bulk_create(invoice_lines, batch_size=500)
+            
+            # Descarcă și salvează PDF-ul după commit (fără lock-uri BD ținute
+            # pe durata descărcării); download_pdf îl reia dacă lipsește
+            try:
+                invoice.pdf_path = _save_invoice_pdf(
+                    smartbill, client.id, year, month,
+                    invoice.smartbill_series, invoice.smartbill_number
+                )
+                BillingInvoice.objects.filter(pk=invoice.pk).update(pdf_path=invoice.pdf_path)
                 
-                serializer = BillingInvoiceSerializer(invoice)
-                return Response({
-                    'success': True,
-                    'message': f'Factura {invoice.invoice_number_display} a fost emisă cu succes.',
-                    'invoice': serializer.data
-                }, status=status.HTTP_201_CREATED)
+            except SmartBillError as e:
+                # PDF-ul nu a putut fi descărcat, dar factura a fost emisă
+                logger.warning(
+                    'PDF-ul facturii %s nu a putut fi descărcat din SmartBill: %s',
+                    invoice.invoice_number_display, e
+                )
+            
+            serializer = BillingInvoiceSerializer(invoice)
+            return Response({
+                'success': True,
+                'message': f'Factura {invoice.invoice_number_display} a fost emisă cu succes.',
+                'invoice': serializer.data
+            }, status=status.HTTP_201_CREATED)
                 
         except SmartBillError as e:
             return Response({
@@ -482,37 +762,46 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
             if invoice.smartbill_series and invoice.smartbill_number:
                 smartbill = get_smartbill_client()
                 if smartbill:
+                    # Transmis clientului în bucăți, pe măsură ce vine din SmartBill;
+                    # prima bucată e citită aici ca erorile să dea 404, nu un răspuns rupt
+                    chunks = smartbill.iter_invoice_pdf(
+                        series=invoice.smartbill_series,
+                        number=invoice.smartbill_number
+                    )
                     try:
-                        pdf_content = smartbill.get_invoice_pdf(
-                            series=invoice.smartbill_series,
-                            number=invoice.smartbill_number
+                        first_chunk = next(chunks, b'')
+                    except SmartBillError:
+                        pass
+                    else:
+                        response = StreamingHttpResponse(
+                            itertools.chain([first_chunk], chunks), content_type='application/pdf'
                         )
-                        response = HttpResponse(pdf_content, content_type='application/pdf')
                         response['Content-Disposition'] = (
                             f'attachment; filename="{invoice.invoice_number_display}.pdf"'
                         )
                         return response
-                    except SmartBillError:
-                        pass
             
             return Response(
                 {'detail': 'PDF-ul nu este disponibil'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Returnează PDF-ul salvat local
+        # Returnează PDF-ul salvat local (FileResponse setează Content-Length
+        # și folosește wsgi.file_wrapper / sendfile când serverul îl oferă)
         pdf_full_path = os.path.join(settings.MEDIA_ROOT, invoice.pdf_path)
-        if os.path.exists(pdf_full_path):
-            return FileResponse(
-                open(pdf_full_path, 'rb'),
-                content_type='application/pdf',
-                as_attachment=True,
-                filename=f'{invoice.invoice_number_display}.pdf'
+        try:
+            pdf_file = open(pdf_full_path, 'rb')
+        except FileNotFoundError:
+            return Response(
+                {'detail': 'Fișierul PDF nu a fost găsit'},
+                status=status.HTTP_404_NOT_FOUND
             )
         
-        return Response(
-            {'detail': 'Fișierul PDF nu a fost găsit'},
-            status=status.HTTP_404_NOT_FOUND
+        return FileResponse(
+            pdf_file,
+            content_type='application/pdf',
+            as_attachment=True,
+            filename=f'{invoice.invoice_number_display}.pdf'
         )
     
     @action(detail=True, methods=['post'], url_path='send-email')
@@ -548,22 +837,7 @@ class BillingInvoiceViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Construiește email-ul
-        month_name = MONTH_NAMES_RO.get(invoice.month, str(invoice.month))
-        subject = f'Factura {invoice.invoice_number_display} – {invoice.client.denumire} – {month_name}/{invoice.year}'
-        
-        body = f"""Bună ziua,
-
-Vă trimitem atașat factura {invoice.invoice_number_display} pentru serviciile prestate în luna {month_name} {invoice.year}.
-
-Detalii factură:
-- Valoare fără TVA: {invoice.subtotal} RON
-- TVA: {invoice.vat_total} RON
-- Total: {invoice.total} RON
-
-Cu respect,
-International Staff Sourcing SRL
-"""
+        subject, body = _invoice_email_content(invoice)
         
         try:
             email = EmailMessage(
@@ -573,12 +847,8 @@ International Staff Sourcing SRL
                 to=[email_to]
             )
             
-            with open(pdf_full_path, 'rb') as f:
-                email.attach(
-                    f'{invoice.invoice_number_display}.pdf',
-                    f.read(),
-                    'application/pdf'
-                )
+            # Fișierul se numește deja {serie}{număr}.pdf
+            email.attach_file(pdf_full_path, 'application/pdf')
             
             email.send()
             
@@ -595,7 +865,9 @@ International Staff Sourcing SRL
             invoice.last_email_sent_at = timezone.now()
             invoice.email_sent_to = email_to
             invoice.email_sent_count += 1
-            invoice.save()
+            invoice.save(update_fields=[
+                'last_email_sent_at', 'email_sent_to', 'email_sent_count', 'updated_at'
+            ])
             
             return Response({
                 'success': True,
@@ -618,6 +890,112 @@ International Staff Sourcing SRL
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+    @action(detail=False, methods=['post'], url_path='send-bulk')
+    def send_bulk(self, request):
+        """
+        Trimite mai multe facturi pe email, refolosind conexiunea SMTP.
+        
+        Payload:
+        {
+            "invoice_ids": [1, 2, 3],
+            "email_to": "contabilitate@client.ro"  // opțional
+        }
+        """
+        serializer = SendBulkEmailRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        email_to_override = serializer.validated_data.get('email_to')
+        
+        invoices = list(self.get_queryset().filter(
+            id__in=serializer.validated_data['invoice_ids']
+        ))
+        _fetch_missing_pdfs(get_smartbill_client(), invoices)
+        
+        # Facturile fără destinatar sau PDF sunt raportate ca omise
+        pending = []
+        skipped = []
+        for invoice in invoices:
+            # Clientul nu are câmp de email: implicit ultimul destinatar al facturii
+            email_to = email_to_override or invoice.email_sent_to
+            if not email_to:
+                skipped.append({'id': invoice.id, 'detail': 'Nu există adresă de email.'})
+                continue
+            pdf_full_path = os.path.join(settings.MEDIA_ROOT, invoice.pdf_path) if invoice.pdf_path else ''
+            if not pdf_full_path or not os.path.exists(pdf_full_path):
+                skipped.append({'id': invoice.id, 'detail': 'PDF-ul facturii nu este disponibil.'})
+                continue
+            pending.append((invoice, email_to, pdf_full_path))
+        
+        # Trimite pe loturi, câte o conexiune SMTP pe lot
+        batch_size = getattr(settings, 'BILLING_EMAIL_BATCH_SIZE', 50)
+        logs = []
+        sent_invoices = []
+        failed = []
+        now = timezone.now()
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                connection = get_connection()
+                connection.open()
+            except Exception as e:
+                # Fără conexiune SMTP, tot lotul este marcat eșuat
+                for invoice, email_to, pdf_full_path in batch:
+                    subject, body = _invoice_email_content(invoice)
+                    logs.append(BillingEmailLog(
+                        invoice=invoice, sent_by=request.user, sent_to=email_to,
+                        subject=subject, status='failed', error_message=str(e)
+                    ))
+                    failed.append({'id': invoice.id, 'detail': str(e)})
+                continue
+            
+            try:
+                for invoice, email_to, pdf_full_path in batch:
+                    subject, body = _invoice_email_content(invoice)
+                    try:
+                        email = EmailMessage(
+                            subject=subject,
+                            body=body,
+                            from_email=settings.DEFAULT_FROM_EMAIL,
+                            to=[email_to],
+                            connection=connection
+                        )
+                        email.attach_file(pdf_full_path, 'application/pdf')
+                        email.send()
+                    except Exception as e:
+                        logs.append(BillingEmailLog(
+                            invoice=invoice, sent_by=request.user, sent_to=email_to,
+                            subject=subject, status='failed', error_message=str(e)
+                        ))
+                        failed.append({'id': invoice.id, 'detail': str(e)})
+                        continue
+                    
+                    logs.append(BillingEmailLog(
+                        invoice=invoice, sent_by=request.user, sent_to=email_to,
+                        subject=subject, status='sent'
+                    ))
+                    invoice.last_email_sent_at = now
+                    invoice.email_sent_to = email_to
+                    invoice.email_sent_count += 1
+                    invoice.updated_at = now
+                    sent_invoices.append(invoice)
+            finally:
+                connection.close()
+        
+        BillingEmailLog.objects.bulk_create(logs, batch_size=500)
+        BillingInvoice.objects.bulk_update(
+            sent_invoices,
+            ['last_email_sent_at', 'email_sent_to', 'email_sent_count', 'updated_at'],
+            batch_size=500
+        )
+        
+        return Response({
+            'success': not failed,
+            'sent_count': len(sent_invoices),
+            'failed': failed,
+            'skipped': skipped,
+            'message': f'{len(sent_invoices)} email-uri trimise.'
+        })
+
+
 class BillingSyncViewSet(viewsets.ViewSet):
     """
     ViewSet pentru sincronizarea plăților din SmartBill.
@@ -668,28 +1046,51 @@ class BillingSyncViewSet(viewsets.ViewSet):
             invoices_updated = 0
             errors = []
             
+            # Facturile locale pentru toate plățile, într-un singur query
+            series_set = {payment.get('invoiceSeries', '') for payment in payments}
+            number_set = {payment.get('invoiceNumber', '') for payment in payments}
+            invoices_by_key = {}
+            matching_invoices = BillingInvoice.objects.filter(
+                smartbill_series__in=series_set,
+                smartbill_number__in=number_set
+            ).only(
+                'id', 'smartbill_series', 'smartbill_number', 'total', 'paid_amount'
+            ).order_by('pk')  # la dubluri câștigă mereu prima factură (setdefault)
+            for invoice in matching_invoices.iterator(chunk_size=1000):
+                invoices_by_key.setdefault(
+                    (invoice.smartbill_series, invoice.smartbill_number), invoice
+                )
+            
+            changed = {}
             for payment in payments:
                 try:
                     # Găsește factura locală
                     series = payment.get('invoiceSeries', '')
                     number = payment.get('invoiceNumber', '')
-                    
-                    invoice = BillingInvoice.objects.filter(
-                        smartbill_series=series,
-                        smartbill_number=number
-                    ).first()
+                    invoice = invoices_by_key.get((series, number))
                     
                     if invoice:
                         # Actualizează statusul de plată
                         paid_amount = Decimal(str(payment.get('paidAmount', 0)))
                         invoice.paid_amount = paid_amount
                         invoice.last_payment_sync_at = now
-                        invoice.save()  # save() actualizează automat due_amount și payment_status
+                        invoice.updated_at = now
+                        invoice.update_payment_fields()
+                        changed[invoice.pk] = invoice
                         invoices_updated += 1
                         
                 except Exception as e:
                     errors.append(f"Eroare la procesarea plății: {str(e)}")
             
+            BillingInvoice.objects.bulk_update(
+                changed.values(),
+                ['paid_amount', 'last_payment_sync_at', 'due_amount', 'payment_status', 'updated_at'],
+                batch_size=500
+            )
+            if changed:
+                # bulk_update nu emite post_save; invalidăm după commit
+                transaction.on_commit(invalidate_billing_reports)
+            
             # Actualizează log-ul
             sync_log.sync_finished_at = timezone.now()
             sync_log.status = BillingSyncLog.Status.SUCCESS
@@ -700,7 +1101,7 @@ class BillingSyncViewSet(viewsets.ViewSet):
             }
             if errors:
                 sync_log.error_message = '\n'.join(errors[:10])  # Primele 10 erori
-            sync_log.save()
+            sync_log.save(update_fields=_SYNC_LOG_RESULT_FIELDS)
             
             return Response({
                 'success': True,
@@ -715,7 +1116,7 @@ class BillingSyncViewSet(viewsets.ViewSet):
             sync_log.sync_finished_at = timezone.now()
             sync_log.status = BillingSyncLog.Status.FAILURE
             sync_log.error_message = str(e)
-            sync_log.save()
+            sync_log.save(update_fields=_SYNC_LOG_RESULT_FIELDS)
             
             return Response({
                 'success': False,
@@ -726,7 +1127,7 @@ class BillingSyncViewSet(viewsets.ViewSet):
             sync_log.sync_finished_at = timezone.now()
             sync_log.status = BillingSyncLog.Status.FAILURE
             sync_log.error_message = str(e)
-            sync_log.save()
+            sync_log.save(update_fields=_SYNC_LOG_RESULT_FIELDS)
             
             return Response({
                 'success': False,
@@ -735,9 +1136,22 @@ class BillingSyncViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'], url_path='sync-logs')
     def sync_logs(self, request):
-        """Returnează istoricul sincronizărilor."""
-        logs = BillingSyncLog.objects.order_by('-sync_started_at')[:50]
-        serializer = BillingSyncLogSerializer(logs, many=True)
+        """
+        Returnează istoricul sincronizărilor (ultimele 50).
+        ?limit=&offset= - răspuns paginat; ?summary=1 - fără error_message/interval.
+        """
+        logs = BillingSyncLog.objects.select_related('user').order_by('-sync_started_at')
+        serializer_class = BillingSyncLogSerializer
+        if request.query_params.get('summary'):
+            serializer_class = BillingSyncLogSummarySerializer
+            logs = logs.only(*_SYNC_LOG_SUMMARY_FIELDS)
+        
+        if 'limit' in request.query_params:
+            paginator = LimitOffsetPagination()
+            page = paginator.paginate_queryset(logs, request, view=self)
+            return paginator.get_paginated_response(serializer_class(page, many=True).data)
+        
+        serializer = serializer_class(logs[:50], many=True)
         return Response(serializer.data)
 
 
@@ -758,68 +1172,69 @@ def billing_report_summary(request):
     serializer.is_valid(raise_exception=True)
     filters = serializer.validated_data
     
-    queryset = BillingInvoice.objects.filter(
-        status=BillingInvoice.InvoiceStatus.ISSUED
+    # Rezultatul e ținut scurt în cache; orice modificare de factură sau
+    # client schimbă versiunea și invalidează toate rapoartele
+    cache_key = 'billing_summary:{}:{}'.format(
+        billing_report_cache_version(),
+        hashlib.blake2b(
+            json.dumps(filters, sort_keys=True, default=str).encode(), digest_size=16
+        ).hexdigest()
     )
+    summary = cache.get_or_set(
+        cache_key,
+        lambda: _billing_summary_data(filters),
+        settings.BILLING_REPORT_CACHE_TTL
+    )
+    return Response(summary)
+
+
+def _billing_summary_data(filters):
+    """Calculează raportul sumar pentru filtrele validate."""
+    queryset = _issued_invoices(filters)
     
-    # Aplică filtre
-    if filters.get('year'):
-        queryset = queryset.filter(year=filters['year'])
-    if filters.get('month'):
-        queryset = queryset.filter(month=filters['month'])
-    if filters.get('client_id'):
-        queryset = queryset.filter(client_id=filters['client_id'])
-    if filters.get('payment_status') and filters['payment_status'] != 'all':
-        queryset = queryset.filter(payment_status=filters['payment_status'])
-    if filters.get('last_months'):
-        today = datetime.now()
-        date_filters = Q()
-        for i in range(filters['last_months']):
-            target_date = today - timedelta(days=30 * i)
-            date_filters |= Q(year=target_date.year, month=target_date.month)
-        queryset = queryset.filter(date_filters)
-    
-    # Calculează sumarul
+    # Calculează sumarul + breakdown pe status (o singură agregare)
     totals = queryset.aggregate(
+        invoice_count=Count('id'),
         total_subtotal=Sum('subtotal'),
         total_vat=Sum('vat_total'),
         total_amount=Sum('total'),
         total_paid=Sum('paid_amount'),
-        total_due=Sum('due_amount')
+        total_due=Sum('due_amount'),
+        paid_count=Count('id', filter=Q(payment_status='paid')),
+        partial_count=Count('id', filter=Q(payment_status='partial')),
+        unpaid_count=Count('id', filter=Q(payment_status='unpaid'))
     )
     
     # Breakdown pe status
     status_breakdown = {
-        'paid': queryset.filter(payment_status='paid').count(),
-        'partial': queryset.filter(payment_status='partial').count(),
-        'unpaid': queryset.filter(payment_status='unpaid').count()
+        'paid': totals['paid_count'],
+        'partial': totals['partial_count'],
+        'unpaid': totals['unpaid_count']
     }
     
-    # Breakdown pe client
-    by_client = []
-    client_ids = queryset.values_list('client_id', flat=True).distinct()
-    
-    for client_id in client_ids:
-        client_invoices = queryset.filter(client_id=client_id)
-        client = Client.objects.get(id=client_id)
-        client_totals = client_invoices.aggregate(
+    # Breakdown pe client (un singur GROUP BY); fără facturi nu mai interogăm
+    client_rows = ()
+    if totals['invoice_count']:
+        client_rows = queryset.values('client_id', 'client__denumire').annotate(
+            invoice_count=Count('id'),
             subtotal=Sum('subtotal'),
             total=Sum('total'),
             paid=Sum('paid_amount'),
             due=Sum('due_amount')
-        )
-        by_client.append({
-            'client_id': client_id,
-            'client_name': client.denumire,
-            'invoice_count': client_invoices.count(),
-            'subtotal': float(client_totals['subtotal'] or 0),
-            'total': float(client_totals['total'] or 0),
-            'paid': float(client_totals['paid'] or 0),
-            'due': float(client_totals['due'] or 0)
-        })
+        ).order_by('client_id')
+    
+    by_client = [{
+        'client_id': row['client_id'],
+        'client_name': row['client__denumire'],
+        'invoice_count': row['invoice_count'],
+        'subtotal': float(row['subtotal'] or 0),
+        'total': float(row['total'] or 0),
+        'paid': float(row['paid'] or 0),
+        'due': float(row['due'] or 0)
+    } for row in client_rows]
     
-    return Response({
-        'invoice_count': queryset.count(),
+    return {
+        'invoice_count': totals['invoice_count'],
         'totals': {
             'subtotal': float(totals['total_subtotal'] or 0),
             'vat': float(totals['total_vat'] or 0),
@@ -829,93 +1244,111 @@ def billing_report_summary(request):
         },
         'status_breakdown': status_breakdown,
         'by_client': by_client
-    })
+    }
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def billing_export_excel(request):
     """Export raport facturare în Excel."""
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment
-    
     serializer = BillingReportFilterSerializer(data=request.query_params)
     serializer.is_valid(raise_exception=True)
     filters = serializer.validated_data
     
-    queryset = BillingInvoice.objects.filter(
-        status=BillingInvoice.InvoiceStatus.ISSUED
-    ).select_related('client')
-    
-    # Aplică filtre (similar cu billing_report_summary)
-    if filters.get('year'):
-        queryset = queryset.filter(year=filters['year'])
-    if filters.get('month'):
-        queryset = queryset.filter(month=filters['month'])
-    if filters.get('client_id'):
-        queryset = queryset.filter(client_id=filters['client_id'])
-    if filters.get('payment_status') and filters['payment_status'] != 'all':
-        queryset = queryset.filter(payment_status=filters['payment_status'])
-    
-    # Creează workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Raport Facturare"
+    # Aceleași filtre ca în billing_report_summary
+    queryset = _issued_invoices(filters).values_list(*_EXPORT_FIELDS)
     
-    # Header
-    headers = [
-        'Nr.', 'Client', 'Serie/Număr', 'Data emiterii', 
-        'Luna', 'An', 'Valoare fără TVA', 'TVA', 'Total',
-        'Încasat', 'Sold', 'Status'
-    ]
+    # Creează workbook (write-only: rândurile nu sunt păstrate în memorie)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Raport Facturare")
     
-    header_font = Font(bold=True, color='FFFFFF')
-    header_fill = PatternFill(start_color='1E40AF', end_color='1E40AF', fill_type='solid')
+    # Lățimile se setează înainte de scriere (în write-only nu se pot măsura
+    # celulele după); coloana Client după cea mai lungă denumire, din SQL
+    widths = list(_EXCEL_EXPORT_WIDTHS)
+    longest_name = queryset.aggregate(n=Max(Length('client__denumire')))['n'] or 0
+    widths[1] = min(max(longest_name, len(_EXPORT_HEADERS[1])) + 2, 30)
+    for letter, width in zip('ABCDEFGHIJKL', widths):
+        ws.column_dimensions[letter].width = width
     
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
+    header_cells = []
+    for header in _EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = _EXCEL_HEADER_FONT
+        cell.fill = _EXCEL_HEADER_FILL
+        cell.alignment = _EXCEL_HEADER_ALIGNMENT
+        header_cells.append(cell)
+    ws.append(header_cells)
     
     # Date
-    for idx, invoice in enumerate(queryset.order_by('-year', '-month', '-issue_date'), 1):
-        status_text = {
-            'paid': 'Încasată',
-            'partial': 'Parțial',
-            'unpaid': 'Neîncasată'
-        }.get(invoice.payment_status, invoice.payment_status)
-        
+    invoices = queryset.order_by('-year', '-month', '-issue_date').iterator(chunk_size=_EXPORT_CHUNK_SIZE)
+    for idx, (client_name, series, number, issue_date, month, year,
+              subtotal, vat_total, total, paid, due, payment_status) in enumerate(invoices, 1):
         ws.append([
             idx,
-            invoice.client.denumire,
-            invoice.invoice_number_display,
-            invoice.issue_date.strftime('%d.%m.%Y') if invoice.issue_date else '-',
-            invoice.month,
-            invoice.year,
-            float(invoice.subtotal),
-            float(invoice.vat_total),
-            float(invoice.total),
-            float(invoice.paid_amount),
-            float(invoice.due_amount),
-            status_text
+            client_name,
+            _export_invoice_number(series, number),
+            issue_date.strftime('%d.%m.%Y') if issue_date else '-',
+            month,
+            year,
+            float(subtotal),
+            float(vat_total),
+            float(total),
+            float(paid),
+            float(due),
+            _PAYMENT_STATUS_LABELS.get(payment_status, payment_status)
         ])
     
-    # Ajustează lățimea coloanelor
-    for col in ws.columns:
-        max_length = max(len(str(cell.value or '')) for cell in col)
-        ws.column_dimensions[col[0].column_letter].width = min(max_length + 2, 30)
+    # Salvează în fișier temporar și trimite în bucăți
+    export_file = _export_spool()
+    wb.save(export_file)
+    
+    return _export_file_response(
+        export_file,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        filename=f'raport_facturare_{datetime.now().strftime("%Y%m%d")}.xlsx'
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def billing_export_csv(request):
+    """
+    Export raport facturare în CSV, pentru volume mari.
+    Rândurile sunt trimise pe măsură ce sunt citite (fără fișier intermediar).
+    """
+    serializer = BillingReportFilterSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    filters = serializer.validated_data
+    
+    invoices = _issued_invoices(filters).values_list(*_EXPORT_FIELDS).order_by(
+        '-year', '-month', '-issue_date'
+    ).iterator(chunk_size=_EXPORT_CHUNK_SIZE)
     
-    # Salvează în buffer
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
+    def rows():
+        writer = csv.writer(_Echo())
+        # BOM, ca Excel să deschidă corect diacriticele
+        yield '\ufeff' + writer.writerow(_EXPORT_HEADERS)
+        for idx, (client_name, series, number, issue_date, month, year,
+                  subtotal, vat_total, total, paid, due, payment_status) in enumerate(invoices, 1):
+            yield writer.writerow([
+                idx,
+                client_name,
+                _export_invoice_number(series, number),
+                issue_date.strftime('%d.%m.%Y') if issue_date else '-',
+                month,
+                year,
+                subtotal,
+                vat_total,
+                total,
+                paid,
+                due,
+                _PAYMENT_STATUS_LABELS.get(payment_status, payment_status)
+            ])
     
-    response = HttpResponse(
-        buffer.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = (
+        f'attachment; filename="raport_facturare_{datetime.now().strftime("%Y%m%d")}.csv"'
     )
-    response['Content-Disposition'] = f'attachment; filename="raport_facturare_{datetime.now().strftime("%Y%m%d")}.xlsx"'
     return response
 
 
@@ -923,13 +1356,7 @@ def billing_export_excel(request):
 @permission_classes([IsAuthenticated])
 def billing_export_pdf(request):
     """Export raport facturare în PDF."""
-    try:
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import A4, landscape
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import cm
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    except ImportError:
+    if not HAS_REPORTLAB:
         return Response(
             {'detail': 'Biblioteca reportlab nu este instalată.'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -939,87 +1366,57 @@ def billing_export_pdf(request):
     serializer.is_valid(raise_exception=True)
     filters = serializer.validated_data
     
-    queryset = BillingInvoice.objects.filter(
-        status=BillingInvoice.InvoiceStatus.ISSUED
-    ).select_related('client')
-    
-    # Aplică filtre
-    if filters.get('year'):
-        queryset = queryset.filter(year=filters['year'])
-    if filters.get('month'):
-        queryset = queryset.filter(month=filters['month'])
-    if filters.get('client_id'):
-        queryset = queryset.filter(client_id=filters['client_id'])
-    if filters.get('payment_status') and filters['payment_status'] != 'all':
-        queryset = queryset.filter(payment_status=filters['payment_status'])
+    queryset = _issued_invoices(filters).values_list(*_EXPORT_FIELDS)
     
     # Creează PDF
-    buffer = BytesIO()
+    export_file = _export_spool()
     doc = SimpleDocTemplate(
-        buffer,
+        export_file,
         pagesize=landscape(A4),
         rightMargin=1*cm, leftMargin=1*cm,
         topMargin=1*cm, bottomMargin=1*cm
     )
     
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=16,
-        alignment=1
-    )
-    
     elements = []
-    elements.append(Paragraph("Raport Facturare", title_style))
+    elements.append(Paragraph("Raport Facturare", _PDF_TITLE_STYLE))
     elements.append(Spacer(1, 20))
     
     # Tabel
-    data = [[
-        'Nr.', 'Client', 'Serie/Nr.', 'Data', 
-        'Luna/An', 'Fără TVA', 'TVA', 'Total',
-        'Încasat', 'Sold', 'Status'
-    ]]
+    data = [list(_PDF_EXPORT_HEADERS)]
     
-    for idx, invoice in enumerate(queryset.order_by('-year', '-month', '-issue_date'), 1):
-        status_text = {
-            'paid': 'Încasată',
-            'partial': 'Parțial',
-            'unpaid': 'Neîncasată'
-        }.get(invoice.payment_status, invoice.payment_status)
-        
+    invoices = queryset.order_by('-year', '-month', '-issue_date').iterator(chunk_size=_EXPORT_CHUNK_SIZE)
+    for idx, (client_name, series, number, issue_date, month, year,
+              subtotal, vat_total, total, paid, due, payment_status) in enumerate(invoices, 1):
         data.append([
             str(idx),
-            invoice.client.denumire[:20],
-            invoice.invoice_number_display,
-            invoice.issue_date.strftime('%d.%m.%Y') if invoice.issue_date else '-',
-            f'{invoice.month}/{invoice.year}',
-            f'{invoice.subtotal:.2f}',
-            f'{invoice.vat_total:.2f}',
-            f'{invoice.total:.2f}',
-            f'{invoice.paid_amount:.2f}',
-            f'{invoice.due_amount:.2f}',
-            status_text
+            client_name[:20],
+            _export_invoice_number(series, number),
+            issue_date.strftime('%d.%m.%Y') if issue_date else '-',
+            f"{month}/{year}",
+            f"{subtotal:.2f}",
+            f"{vat_total:.2f}",
+            f"{total:.2f}",
+            f"{paid:.2f}",
+            f"{due:.2f}",
+            _PAYMENT_STATUS_LABELS.get(payment_status, payment_status)
         ])
     
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e1')),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f1f5f9')])
-    ]))
+    # Lățimi și înălțimi fixe: reportlab nu mai măsoară fiecare celulă;
+    # header-ul se repetă pe fiecare pagină
+    table = LongTable(
+        data,
+        colWidths=[w * cm for w in _PDF_EXPORT_COL_WIDTHS],
+        rowHeights=[0.9 * cm] + [0.6 * cm] * (len(data) - 1),
+        repeatRows=1
+    )
+    table.setStyle(_PDF_TABLE_STYLE)
     
     elements.append(table)
     doc.build(elements)
-    buffer.seek(0)
     
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="raport_facturare_{datetime.now().strftime("%Y%m%d")}.pdf"'
-    return response
+    return _export_file_response(
+        export_file,
+        content_type='application/pdf',
+        filename=f'raport_facturare_{datetime.now().strftime("%Y%m%d")}.pdf'
+    )
 
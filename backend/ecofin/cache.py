@@ -0,0 +1,25 @@
+"""
+Cache pentru rapoartele de facturare Eco-Fin.
+Rapoartele sunt cheiate după o versiune; la modificarea unei facturi sau
+a unui client versiunea se schimbă și toate rapoartele din cache devin invalide.
+"""
+import time
+
+from django.core.cache import cache
+
+
+_REPORT_CACHE_VERSION_KEY = 'billing_summary:version'
+
+
+def billing_report_cache_version():
+    """Versiunea curentă a cache-ului de rapoarte facturare."""
+    version = cache.get(_REPORT_CACHE_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(_REPORT_CACHE_VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_billing_reports():
+    """Invalidează rapoartele din cache (apelat după commit-ul modificărilor)."""
+    cache.set(_REPORT_CACHE_VERSION_KEY, time.time_ns(), None)
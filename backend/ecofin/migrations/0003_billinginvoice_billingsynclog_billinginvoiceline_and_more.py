@@ -0,0 +1,111 @@
+# Generated by Django 4.2.16 on 2026-10-16 06:06
+
+from decimal import Decimal
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iss', '0011_ambasada_worker_ambasada'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ecofin', '0002_alter_ecofinmonthlyreport_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillingInvoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(2020), django.core.validators.MaxValueValidator(2100)])),
+                ('month', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)])),
+                ('smartbill_document_id', models.CharField(blank=True, help_text='ID document SmartBill', max_length=100)),
+                ('smartbill_series', models.CharField(blank=True, help_text='Seria facturii SmartBill', max_length=20)),
+                ('smartbill_number', models.CharField(blank=True, help_text='Numărul facturii SmartBill', max_length=20)),
+                ('issue_date', models.DateField(blank=True, help_text='Data emiterii facturii', null=True)),
+                ('subtotal', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Valoare fără TVA', max_digits=12)),
+                ('vat_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Total TVA', max_digits=12)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Total cu TVA', max_digits=12)),
+                ('currency', models.CharField(default='RON', help_text='Moneda facturii', max_length=3)),
+                ('hours_billed', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Ore facturate', max_digits=10)),
+                ('hourly_rate', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Tarif orar aplicat', max_digits=10)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('issued', 'Emisă'), ('cancelled', 'Anulată')], default='draft', max_length=20)),
+                ('payment_status', models.CharField(choices=[('unpaid', 'Neîncasată'), ('partial', 'Parțial încasată'), ('paid', 'Încasată')], default='unpaid', max_length=20)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sumă încasată', max_digits=12)),
+                ('due_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sumă de încasat (sold)', max_digits=12)),
+                ('last_payment_sync_at', models.DateTimeField(blank=True, help_text='Ultima sincronizare plăți din SmartBill', null=True)),
+                ('pdf_path', models.CharField(blank=True, help_text='Calea către PDF-ul facturii în storage', max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_email_sent_at', models.DateTimeField(blank=True, null=True)),
+                ('email_sent_to', models.EmailField(blank=True, max_length=254)),
+                ('email_sent_count', models.PositiveIntegerField(default=0)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='billing_invoices', to='iss.client')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='billing_invoices_created', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Factură SmartBill',
+                'verbose_name_plural': 'Facturi SmartBill',
+                'ordering': ['-year', '-month', '-issue_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BillingSyncLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sync_started_at', models.DateTimeField(auto_now_add=True)),
+                ('sync_finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_from_ts', models.DateTimeField(help_text='Timestamp de start pentru cererea API')),
+                ('requested_to_ts', models.DateTimeField(help_text='Timestamp de final pentru cererea API')),
+                ('status', models.CharField(choices=[('in_progress', 'În desfășurare'), ('success', 'Succes'), ('failure', 'Eșuat')], default='in_progress', max_length=20)),
+                ('result_counts', models.JSONField(blank=True, default=dict, help_text='Statistici: invoices_updated, payments_found, errors')),
+                ('error_message', models.TextField(blank=True)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='billing_sync_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Log sincronizare plăți',
+                'verbose_name_plural': 'Log-uri sincronizare plăți',
+                'ordering': ['-sync_started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BillingInvoiceLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(help_text='Descrierea serviciului', max_length=500)),
+                ('quantity', models.DecimalField(decimal_places=2, default=Decimal('1.00'), help_text='Cantitate', max_digits=10)),
+                ('unit_price', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Preț unitar fără TVA', max_digits=12)),
+                ('vat_rate', models.DecimalField(decimal_places=2, default=Decimal('21.00'), help_text='Cota TVA (%)', max_digits=5)),
+                ('line_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Total linie fără TVA', max_digits=12)),
+                ('line_vat', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='TVA linie', max_digits=12)),
+                ('line_type', models.CharField(choices=[('standard', 'Serviciu standard'), ('difference', 'Diferență'), ('extra', 'Serviciu suplimentar')], default='standard', max_length=20)),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='ecofin.billinginvoice')),
+            ],
+            options={
+                'verbose_name': 'Linie factură',
+                'verbose_name_plural': 'Linii factură',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BillingEmailLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_to', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('sent', 'Trimis'), ('failed', 'Eșuat')], default='sent', max_length=20)),
+                ('error_message', models.TextField(blank=True)),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_logs', to='ecofin.billinginvoice')),
+                ('sent_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Log email factură',
+                'verbose_name_plural': 'Log-uri email facturi',
+                'ordering': ['-sent_at'],
+            },
+        ),
+    ]
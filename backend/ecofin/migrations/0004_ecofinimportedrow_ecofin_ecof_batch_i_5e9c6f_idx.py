@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-16 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0003_billinginvoice_billingsynclog_billinginvoiceline_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ecofinimportedrow',
+            index=models.Index(fields=['-batch', 'row_number'], name='ecofin_ecof_batch_i_5e9c6f_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-16 06:09
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0004_ecofinimportedrow_ecofin_ecof_batch_i_5e9c6f_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='ecofinimportedrow',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nr_cim'), name='gin_trgm_ops'), name='ecofin_row_nr_cim_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='ecofinimportedrow',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nume'), name='gin_trgm_ops'), name='ecofin_row_nume_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='ecofinimportedrow',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('prenume'), name='gin_trgm_ops'), name='ecofin_row_prenume_trgm'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-16 06:13
+
+from django.db import migrations, models
+import django.db.models.fields.json
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0005_importedrow_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billingsynclog',
+            index=models.Index(django.db.models.functions.comparison.Cast(django.db.models.fields.json.KeyTextTransform('invoices_updated', 'result_counts'), models.IntegerField()), name='ecofin_sync_inv_updated_idx'),
+        ),
+    ]
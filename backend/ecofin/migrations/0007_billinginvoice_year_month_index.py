@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-16 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0006_billingsynclog_invoices_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billinginvoice',
+            index=models.Index(fields=['year', 'month'], name='ecofin_bill_year_4abef9_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-16 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0007_billinginvoice_year_month_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billinginvoice',
+            index=models.Index(fields=['client', 'year', 'month', 'status'], name='ecofin_inv_cym_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='billinginvoice',
+            index=models.Index(fields=['smartbill_series', 'smartbill_number'], name='ecofin_inv_smartbill_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-16 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0008_billinginvoice_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billingsynclog',
+            index=models.Index(fields=['-sync_started_at'], name='ecofin_sync_started_idx'),
+        ),
+    ]
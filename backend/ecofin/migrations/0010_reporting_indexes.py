@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-16 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0009_billingsynclog_started_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billinginvoice',
+            index=models.Index(fields=['status', 'year', 'month'], name='ecofin_inv_status_ym_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='billinginvoice',
+            index=models.Index(condition=models.Q(('payment_status', 'unpaid'), ('status', 'issued')), fields=['year', 'month'], name='ecofin_inv_unpaid_ym_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecofinprocessedrecord',
+            index=models.Index(fields=['year', 'month', 'client'], name='ecofin_rec_ym_client_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-16 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0010_reporting_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ecofinimportedrow',
+            index=models.Index(fields=['batch', 'status'], name='ecofin_row_batch_status_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-16 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0011_importedrow_batch_status_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ecofinprocessedrecord',
+            index=models.Index(condition=models.Q(('is_validated', False)), fields=['year', 'month'], name='ecofin_rec_draft_ym_idx'),
+        ),
+    ]
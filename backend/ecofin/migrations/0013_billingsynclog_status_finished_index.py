@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-16 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0012_processedrecord_draft_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billingsynclog',
+            index=models.Index(fields=['status', '-sync_finished_at'], name='ecofin_sync_status_fin_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-16 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0013_billingsynclog_status_finished_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ecofinimportbatch',
+            index=models.Index(fields=['year', 'month'], name='ecofin_batch_ym_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecofinimportbatch',
+            index=models.Index(fields=['status', '-created_at'], name='ecofin_batch_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecofinmonthlyreport',
+            index=models.Index(fields=['year', 'month', 'client'], name='ecofin_rep_ym_client_idx'),
+        ),
+    ]
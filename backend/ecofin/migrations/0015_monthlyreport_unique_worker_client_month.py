@@ -0,0 +1,42 @@
+# Generated by Django 4.2.16 on 2026-10-16 07:40
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def remove_duplicate_reports(apps, schema_editor):
+    """
+    Înainte de constrângerea unică: pentru fiecare (worker, client, year, month)
+    păstrează raportul actualizat cel mai recent și le șterge pe celelalte.
+    """
+    EcoFinMonthlyReport = apps.get_model('ecofin', 'EcoFinMonthlyReport')
+    duplicates = (
+        EcoFinMonthlyReport.objects
+        .values('worker_id', 'client_id', 'year', 'month')
+        .annotate(reports=Count('id'))
+        .filter(reports__gt=1)
+        .order_by()
+    )
+    for group in list(duplicates):
+        reports = EcoFinMonthlyReport.objects.filter(
+            worker_id=group['worker_id'], client_id=group['client_id'],
+            year=group['year'], month=group['month']
+        )
+        keep_id = reports.order_by('-updated_at', '-id').values_list('id', flat=True)[0]
+        reports.exclude(id=keep_id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iss', '0012_worker_cim_upper_index'),
+        ('ecofin', '0014_importbatch_monthlyreport_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reports, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='ecofinmonthlyreport',
+            unique_together={('worker', 'client', 'year', 'month')},
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.16 on 2026-10-16 08:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecofin', '0015_monthlyreport_unique_worker_client_month'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='billinginvoice',
+            name='ecofin_bill_year_4abef9_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='ecofinimportedrow',
+            new_name='ecofin_row_batch_desc_idx',
+            old_name='ecofin_ecof_batch_i_5e9c6f_idx',
+        ),
+    ]
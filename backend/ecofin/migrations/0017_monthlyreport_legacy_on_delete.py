@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-16 08:27
+
+from django.conf import settings
+from django.db import migrations, models
+import ecofin.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iss', '0012_worker_cim_upper_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ecofin', '0016_name_row_index_drop_invoice_ym_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ecofinmonthlyreport',
+            name='client',
+            field=models.ForeignKey(on_delete=ecofin.models.legacy_report_cascade, related_name='ecofin_reports', to='iss.client'),
+        ),
+        migrations.AlterField(
+            model_name='ecofinmonthlyreport',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=ecofin.models.legacy_report_set_null, related_name='ecofin_reports_created', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='ecofinmonthlyreport',
+            name='validated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=ecofin.models.legacy_report_set_null, related_name='ecofin_validated', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='ecofinmonthlyreport',
+            name='worker',
+            field=models.ForeignKey(on_delete=ecofin.models.legacy_report_cascade, related_name='ecofin_reports', to='iss.worker'),
+        ),
+    ]
@@ -8,8 +8,18 @@ Conform specificațiilor:
 - EcoFinProcessedRecord: date procesate și calculate
 - EcoFinImportBatch: tracking importuri
 """
-from django.db import models
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.db import connection, models
+from django.db.models import Count, F, Prefetch, Q
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, Upper
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.exceptions import PermissionDenied
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
 
@@ -65,6 +75,20 @@ class EcoFinSettings(models.Model):
         return f"{status} Setări {self.month:02d}/{self.year}"
 
 
+def _copy_value(field, value):
+    """
+    Valoarea unui câmp în formatul CSV al COPY: NULL ca \\N, booleanele ca
+    t/f și JSON-ul serializat; restul trece prin get_db_prep_save.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(field, models.JSONField):
+        return json.dumps(value, cls=field.encoder)
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return field.get_db_prep_save(value, connection)
+
+
 class EcoFinImportedRow(models.Model):
     """
     Date brute încărcate din Excel.
@@ -149,10 +173,48 @@ class EcoFinImportedRow(models.Model):
         verbose_name = "Rând Importat Eco-Fin"
         verbose_name_plural = "Rânduri Importate Eco-Fin"
         ordering = ['batch', 'row_number']
+        indexes = [
+            # Ordinea implicită din admin: cele mai noi batch-uri primele
+            models.Index(fields=["-batch", "row_number"], name="ecofin_row_batch_desc_idx"),
+            # Contoarele batch-ului (refresh_stats) și filtrarea rândurilor după status
+            models.Index(fields=["batch", "status"], name="ecofin_row_batch_status_idx"),
+            # Căutarea din admin (icontains -> UPPER(col) LIKE '%x%') folosește indexurile trigram
+            GinIndex(OpClass(Upper("nr_cim"), name="gin_trgm_ops"), name="ecofin_row_nr_cim_trgm"),
+            GinIndex(OpClass(Upper("nume"), name="gin_trgm_ops"), name="ecofin_row_nume_trgm"),
+            GinIndex(OpClass(Upper("prenume"), name="gin_trgm_ops"), name="ecofin_row_prenume_trgm"),
+        ]
 
     def __str__(self):
         return f"Row {self.row_number}: {self.nr_cim} - {self.nume} {self.prenume}"
 
+    @classmethod
+    def bulk_insert(cls, rows, batch_size=500):
+        """
+        Salvează rândurile importate. Peste ECOFIN_IMPORT_COPY_THRESHOLD rânduri
+        (doar pe PostgreSQL) folosește COPY ... FROM STDIN, altfel bulk_create.
+        Atenție: cu COPY instanțele nu primesc id (row.pk rămâne None), deci
+        apelanții nu se pot baza pe pk-urile rândurilor după salvare.
+        """
+        threshold = getattr(settings, 'ECOFIN_IMPORT_COPY_THRESHOLD', 20000)
+        if connection.vendor != 'postgresql' or len(rows) <= threshold:
+            cls.objects.bulk_create(rows, batch_size=batch_size)
+            return
+        
+        fields = [field for field in cls._meta.concrete_fields if not field.primary_key]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(field, field.pre_save(row, add=True)) for field in fields])
+        buffer.seek(0)
+        
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(cls._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+
 
 class EcoFinProcessedRecord(models.Model):
     """
@@ -301,6 +363,17 @@ class EcoFinProcessedRecord(models.Model):
         ordering = ['-year', '-month', 'worker__nume']
         # Un lucrător poate avea o singură înregistrare per lună/client
         unique_together = ['worker', 'client', 'year', 'month']
+        indexes = [
+            # Rapoartele grupează pe lună și client
+            models.Index(fields=['year', 'month', 'client'], name='ecofin_rec_ym_client_idx'),
+            # Înregistrările nevalidate ale lunii (re-import, recalcul la schimbarea
+            # setărilor); indexul parțial rămâne mic pe măsură ce lunile se validează
+            models.Index(
+                fields=['year', 'month'],
+                condition=models.Q(is_validated=False),
+                name='ecofin_rec_draft_ym_idx'
+            ),
+        ]
 
     def __str__(self):
         status = "✓" if self.is_validated else "○"
@@ -336,10 +409,59 @@ class EcoFinProcessedRecord(models.Model):
         
         return self.profitabilitate
 
+    # Coloanele din lucrător/client afișate în listări (serializer, rapoarte)
+    _LISTING_RELATED_FIELDS = (
+        'worker__nume', 'worker__prenume', 'worker__pasaport_nr',
+        'worker__cetatenie', 'worker__cnp', 'client__denumire',
+        'validated_by__username', 'created_by__username',
+    )
+
+    @classmethod
+    def for_listing(cls, queryset=None):
+        """
+        Înregistrările cu lucrătorul, clientul și utilizatorii (validat/creat de)
+        în același JOIN, citind din tabelele lor doar coloanele afișate.
+        """
+        if queryset is None:
+            queryset = cls.objects.all()
+        own_fields = [field.name for field in cls._meta.concrete_fields]
+        return queryset.select_related('worker', 'client', 'validated_by', 'created_by').only(
+            *own_fields, *cls._LISTING_RELATED_FIELDS
+        )
+
+    # Rezultatele recalculate la fiecare salvare
+    _COST_RESULT_FIELDS = (
+        'cost_salarial_complet', 'cost_salariat_total', 'venit_generat', 'profitabilitate',
+    )
+
+    @classmethod
+    def recompute_sql(cls, year, month):
+        """
+        Recalculează costurile înregistrărilor nevalidate dintr-o lună într-un
+        singur UPDATE (aceeași formulă ca calculate_costs_and_profit, în SQL).
+        Returnează numărul de înregistrări actualizate.
+        """
+        cost_salarial_complet = F('salariu_brut') + F('cam')
+        cost_salariat_total = (
+            cost_salarial_complet + F('cost_cazare') + F('cost_masa') +
+            F('cost_transport') + F('cota_indirecte') + F('cost_concediu')
+        )
+        venit_generat = F('ore_lucrate') * F('tarif_orar')
+        return cls.objects.filter(year=year, month=month, is_validated=False).update(
+            cost_salarial_complet=cost_salarial_complet,
+            cost_salariat_total=cost_salariat_total,
+            venit_generat=venit_generat,
+            profitabilitate=venit_generat - cost_salariat_total
+        )
+
     def save(self, *args, **kwargs):
         # Recalculează la fiecare salvare (dacă nu e validat)
         if not self.is_validated:
             self.calculate_costs_and_profit()
+            # Cu update_fields, rezultatele recalculate se scriu și ele
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self._COST_RESULT_FIELDS}
         super().save(*args, **kwargs)
 
 
@@ -400,25 +522,112 @@ class EcoFinImportBatch(models.Model):
         verbose_name = "Import Eco-Fin"
         verbose_name_plural = "Importuri Eco-Fin"
         ordering = ['-created_at']
+        indexes = [
+            # Lista de batch-uri din API (filtrare pe an/lună)
+            models.Index(fields=['year', 'month'], name='ecofin_batch_ym_idx'),
+            # Admin: filtrare după status, cele mai noi primele
+            models.Index(fields=['status', '-created_at'], name='ecofin_batch_status_idx'),
+        ]
 
     def __str__(self):
         return f"Import {self.filename} ({self.month:02d}/{self.year}) - {self.get_status_display()}"
 
+    @classmethod
+    def get_with_rows(cls, pk):
+        """
+        Batch-ul cu rândurile preîncărcate (2 query-uri în loc de 1 + 2N):
+        rândurile vin cu lucrătorul și clientul în același JOIN, din care
+        se citesc doar coloanele afișate.
+        """
+        row_fields = [field.name for field in EcoFinImportedRow._meta.concrete_fields]
+        rows = EcoFinImportedRow.objects.select_related('worker', 'client').only(
+            *row_fields, 'worker__nume', 'worker__prenume', 'client__denumire'
+        )
+        return cls.objects.select_related('imported_by', 'validated_by').prefetch_related(
+            Prefetch('rows', queryset=rows)
+        ).get(pk=pk)
+
+    def refresh_stats(self):
+        """
+        Recalculează contoarele din rândurile importate: un SELECT agregat
+        (COUNT-uri condiționale) și un UPDATE. Returnează contoarele.
+        """
+        row_status = EcoFinImportedRow.Status
+        stats = self.rows.aggregate(
+            total_rows=Count('id'),
+            matched_rows=Count('id', filter=Q(status__in=[row_status.MATCHED, row_status.PROCESSED])),
+            error_rows=Count('id', filter=Q(status=row_status.ERROR)),
+            processed_rows=Count('id', filter=Q(status=row_status.PROCESSED))
+        )
+        EcoFinImportBatch.objects.filter(pk=self.pk).update(**stats)
+        for field, value in stats.items():
+            setattr(self, field, value)
+        return stats
+
+
+def legacy_reports_readonly():
+    """True când modelul depreciat EcoFinMonthlyReport este doar-citire (ECOFIN_LEGACY_READONLY)."""
+    return getattr(settings, 'ECOFIN_LEGACY_READONLY', False)
+
+
+def _ensure_legacy_reports_writable():
+    if legacy_reports_readonly():
+        raise PermissionDenied('Rapoartele Eco-Fin vechi sunt doar-citire (ECOFIN_LEGACY_READONLY).')
+
+
+# Colectorul de ștergere al Django șterge/actualizează rândurile legate direct
+# (_raw_delete, update_batch), ocolind QuerySet-ul și save()/delete() de mai jos;
+# de aceea regula doar-citire se aplică și în on_delete.
+def legacy_report_cascade(collector, field, sub_objs, using):
+    """CASCADE care ridică PermissionDenied cu ECOFIN_LEGACY_READONLY activ."""
+    _ensure_legacy_reports_writable()
+    models.CASCADE(collector, field, sub_objs, using)
+
+
+def legacy_report_set_null(collector, field, sub_objs, using):
+    """SET_NULL care ridică PermissionDenied cu ECOFIN_LEGACY_READONLY activ."""
+    _ensure_legacy_reports_writable()
+    models.SET_NULL(collector, field, sub_objs, using)
+
+
+class EcoFinMonthlyReportQuerySet(models.QuerySet):
+    """Blochează și scrierile în masă când modelul vechi este doar-citire."""
+
+    def update(self, **kwargs):
+        _ensure_legacy_reports_writable()
+        return super().update(**kwargs)
+
+    def delete(self):
+        _ensure_legacy_reports_writable()
+        return super().delete()
+
+    def bulk_create(self, objs, *args, **kwargs):
+        _ensure_legacy_reports_writable()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        _ensure_legacy_reports_writable()
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
 
 # Păstrăm și modelul vechi pentru compatibilitate în perioada de tranziție
 class EcoFinMonthlyReport(models.Model):
     """
     [DEPRECIAT] - Folosiți EcoFinProcessedRecord
     Păstrat pentru compatibilitate cu datele existente.
+
+    Cu ECOFIN_LEGACY_READONLY activ orice scriere ridică PermissionDenied,
+    inclusiv ștergerea unui lucrător, client sau utilizator care ar șterge
+    rapoarte în cascadă sau le-ar goli validated_by/created_by.
     """
     worker = models.ForeignKey(
         'iss.Worker',
-        on_delete=models.CASCADE,
+        on_delete=legacy_report_cascade,
         related_name='ecofin_reports'
     )
     client = models.ForeignKey(
         'iss.Client',
-        on_delete=models.CASCADE,
+        on_delete=legacy_report_cascade,
         related_name='ecofin_reports'
     )
     year = models.PositiveIntegerField(
@@ -457,19 +666,27 @@ class EcoFinMonthlyReport(models.Model):
     is_validated = models.BooleanField(default=False)
     validated_at = models.DateTimeField(null=True, blank=True)
     validated_by = models.ForeignKey(
-        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='ecofin_validated'
+        User, on_delete=legacy_report_set_null, null=True, blank=True, related_name='ecofin_validated'
     )
     created_by = models.ForeignKey(
-        User, on_delete=models.SET_NULL, null=True, related_name='ecofin_reports_created'
+        User, on_delete=legacy_report_set_null, null=True, related_name='ecofin_reports_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     notes = models.TextField(blank=True)
 
+    objects = EcoFinMonthlyReportQuerySet.as_manager()
+
     class Meta:
         verbose_name = "[Depreciat] Raport Eco-Fin"
         verbose_name_plural = "[Depreciat] Rapoarte Eco-Fin"
         ordering = ['-year', '-month', 'worker__nume']
+        # Un singur raport per lucrător/client/lună, ca la EcoFinProcessedRecord
+        unique_together = ['worker', 'client', 'year', 'month']
+        indexes = [
+            # Endpoint-ul de compatibilitate filtrează pe lună și client
+            models.Index(fields=['year', 'month', 'client'], name='ecofin_rep_ym_client_idx'),
+        ]
 
     def __str__(self):
         return f"[OLD] {self.worker.nume} - {self.client.denumire} ({self.month:02d}/{self.year})"
@@ -484,9 +701,15 @@ class EcoFinMonthlyReport(models.Model):
         return self.profit_brut
 
     def save(self, *args, **kwargs):
+        """Cu ECOFIN_LEGACY_READONLY activ ridică PermissionDenied."""
+        _ensure_legacy_reports_writable()
         self.calculate_profit()
         super().save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        _ensure_legacy_reports_writable()
+        return super().delete(*args, **kwargs)
+
 
 # =============================================================================
 # MODELE FACTURARE SMARTBILL
@@ -620,12 +843,36 @@ class BillingInvoice(models.Model):
         verbose_name_plural = "Facturi SmartBill"
         ordering = ['-year', '-month', '-issue_date']
         # Permite mai multe facturi pe aceeași lună (diferențe, servicii extra)
+        indexes = [
+            # preview/issue: facturi emise pentru client + lună
+            models.Index(
+                fields=['client', 'year', 'month', 'status'],
+                name='ecofin_inv_cym_status_idx'
+            ),
+            # sync_payments: căutare după seria + numărul SmartBill
+            models.Index(
+                fields=['smartbill_series', 'smartbill_number'],
+                name='ecofin_inv_smartbill_idx'
+            ),
+            # Rapoarte/exporturi: facturi emise pe perioadă
+            models.Index(
+                fields=['status', 'year', 'month'],
+                name='ecofin_inv_status_ym_idx'
+            ),
+            # Facturile emise neîncasate (subset mic, interogat des)
+            models.Index(
+                fields=['year', 'month'],
+                condition=models.Q(status='issued', payment_status='unpaid'),
+                name='ecofin_inv_unpaid_ym_idx'
+            ),
+        ]
 
     def __str__(self):
         series_num = f"{self.smartbill_series}{self.smartbill_number}" if self.smartbill_series else "DRAFT"
         return f"Factură {series_num} - {self.client.denumire} ({self.month:02d}/{self.year})"
     
-    def save(self, *args, **kwargs):
+    def update_payment_fields(self):
+        """Recalculează due_amount și payment_status în memorie (fără query)."""
         # Calculează due_amount
         self.due_amount = self.total - self.paid_amount
         # Actualizează payment_status
@@ -635,6 +882,13 @@ class BillingInvoice(models.Model):
             self.payment_status = self.PaymentStatus.PARTIAL
         else:
             self.payment_status = self.PaymentStatus.UNPAID
+
+    def save(self, *args, **kwargs):
+        self.update_payment_fields()
+        # Cu update_fields care ating sumele, se scrie și statusul derivat
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'total', 'paid_amount'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'due_amount', 'payment_status'}
         super().save(*args, **kwargs)
     
     @property
@@ -699,13 +953,35 @@ class BillingInvoiceLine(models.Model):
     def __str__(self):
         return f"{self.description} - {self.line_total} RON"
     
-    def save(self, *args, **kwargs):
-        # Calculează totalurile
+    def calculate_totals(self):
+        """Calculează totalurile liniei (folosit și înainte de bulk_create)."""
         self.line_total = self.quantity * self.unit_price
         self.line_vat = self.line_total * (self.vat_rate / 100)
+
+    @classmethod
+    def build(cls, invoice, description, quantity, unit_price, vat_rate, line_type='standard'):
+        """Linie nesalvată, cu totalurile calculate - pentru bulk_create."""
+        line = cls(
+            invoice=invoice,
+            description=description,
+            quantity=quantity,
+            unit_price=unit_price,
+            vat_rate=vat_rate,
+            line_type=line_type
+        )
+        line.calculate_totals()
+        return line
+
+    def save(self, *args, **kwargs):
+        self.calculate_totals()
         super().save(*args, **kwargs)
 
 
+def result_count_expression(key):
+    """Expresie SQL pentru valoarea numerică a unei chei din BillingSyncLog.result_counts."""
+    return Cast(KeyTextTransform(key, 'result_counts'), models.IntegerField())
+
+
 class BillingSyncLog(models.Model):
     """
     Log sincronizare plăți din SmartBill.
@@ -751,6 +1027,17 @@ class BillingSyncLog(models.Model):
         verbose_name = "Log sincronizare plăți"
         verbose_name_plural = "Log-uri sincronizare plăți"
         ordering = ['-sync_started_at']
+        indexes = [
+            # Istoricul sincronizărilor (cele mai recente primele)
+            models.Index(fields=['-sync_started_at'], name='ecofin_sync_started_idx'),
+            # sync_payments: ultima sincronizare reușită (punctul de start incremental)
+            models.Index(fields=['status', '-sync_finished_at'], name='ecofin_sync_status_fin_idx'),
+            # Sortare/filtrare în admin după numărul de facturi actualizate
+            models.Index(
+                result_count_expression('invoices_updated'),
+                name='ecofin_sync_inv_updated_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Sync {self.sync_started_at.strftime('%Y-%m-%d %H:%M')} - {self.get_status_display()}"
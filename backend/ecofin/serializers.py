@@ -19,7 +19,7 @@ from .models import (
 
 class EcoFinSettingsSerializer(serializers.ModelSerializer):
     """Serializer pentru setările globale Eco-Fin."""
-    created_by_username = serializers.SerializerMethodField()
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True, default=None)
     
     class Meta:
         model = EcoFinSettings
@@ -32,15 +32,12 @@ class EcoFinSettingsSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_by', 'created_at', 'updated_at']
 
-    def get_created_by_username(self, obj):
-        return obj.created_by.username if obj.created_by else None
-
 
 class EcoFinImportedRowSerializer(serializers.ModelSerializer):
     """Serializer pentru rândurile importate din Excel."""
     worker_nume = serializers.CharField(source='worker.nume', read_only=True)
     worker_prenume = serializers.CharField(source='worker.prenume', read_only=True)
-    client_denumire = serializers.SerializerMethodField()
+    client_denumire = serializers.CharField(source='client.denumire', read_only=True, default=None)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     
     class Meta:
@@ -59,9 +56,6 @@ class EcoFinImportedRowSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at']
 
-    def get_client_denumire(self, obj):
-        return obj.client.denumire if obj.client else None
-
 
 class EcoFinProcessedRecordSerializer(serializers.ModelSerializer):
     """Serializer pentru înregistrările procesate."""
@@ -69,10 +63,10 @@ class EcoFinProcessedRecordSerializer(serializers.ModelSerializer):
     worker_prenume = serializers.CharField(source='worker.prenume', read_only=True)
     worker_pasaport = serializers.CharField(source='worker.pasaport_nr', read_only=True)
     worker_cetatenie = serializers.CharField(source='worker.cetatenie', read_only=True)
-    worker_cnp = serializers.SerializerMethodField()
-    client_denumire = serializers.SerializerMethodField()
-    validated_by_username = serializers.SerializerMethodField()
-    created_by_username = serializers.SerializerMethodField()
+    worker_cnp = serializers.CharField(source='worker.cnp', read_only=True, default=None)
+    client_denumire = serializers.CharField(source='client.denumire', read_only=True, default=None)
+    validated_by_username = serializers.CharField(source='validated_by.username', read_only=True, default=None)
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True, default=None)
     
     class Meta:
         model = EcoFinProcessedRecord
@@ -100,23 +94,11 @@ class EcoFinProcessedRecordSerializer(serializers.ModelSerializer):
             'created_by', 'created_at', 'updated_at'
         ]
 
-    def get_worker_cnp(self, obj):
-        return obj.worker.cnp if obj.worker else None
-
-    def get_client_denumire(self, obj):
-        return obj.client.denumire if obj.client else None
-
-    def get_validated_by_username(self, obj):
-        return obj.validated_by.username if obj.validated_by else None
-
-    def get_created_by_username(self, obj):
-        return obj.created_by.username if obj.created_by else None
-
 
 class EcoFinImportBatchSerializer(serializers.ModelSerializer):
     """Serializer pentru batch-uri de import."""
-    imported_by_username = serializers.SerializerMethodField()
-    validated_by_username = serializers.SerializerMethodField()
+    imported_by_username = serializers.CharField(source='imported_by.username', read_only=True, default=None)
+    validated_by_username = serializers.CharField(source='validated_by.username', read_only=True, default=None)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     
     class Meta:
@@ -131,12 +113,6 @@ class EcoFinImportBatchSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'validated_at']
 
-    def get_imported_by_username(self, obj):
-        return obj.imported_by.username if obj.imported_by else None
-
-    def get_validated_by_username(self, obj):
-        return obj.validated_by.username if obj.validated_by else None
-
 
 class EcoFinPreviewRowSerializer(serializers.Serializer):
     """Serializer pentru rândurile din preview (înainte de procesare)."""
@@ -221,8 +197,8 @@ class EcoFinMonthlyReportSerializer(serializers.ModelSerializer):
     worker_cetatenie = serializers.CharField(source='worker.cetatenie', read_only=True)
     worker_cnp = serializers.CharField(source='worker.cnp', read_only=True)
     client_denumire = serializers.CharField(source='client.denumire', read_only=True)
-    validated_by_username = serializers.SerializerMethodField()
-    created_by_username = serializers.SerializerMethodField()
+    validated_by_username = serializers.CharField(source='validated_by.username', read_only=True, default=None)
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True, default=None)
     
     class Meta:
         model = EcoFinMonthlyReport
@@ -245,11 +221,23 @@ class EcoFinMonthlyReportSerializer(serializers.ModelSerializer):
             'created_by', 'created_at', 'updated_at'
         ]
 
-    def get_validated_by_username(self, obj):
-        return obj.validated_by.username if obj.validated_by else None
 
-    def get_created_by_username(self, obj):
-        return obj.created_by.username if obj.created_by else None
+class EcoFinMonthlyReportListSerializer(serializers.ModelSerializer):
+    """[DEPRECIAT] Serializer simplificat pentru lista de rapoarte lunare."""
+    worker_nume = serializers.CharField(source='worker.nume', read_only=True)
+    worker_prenume = serializers.CharField(source='worker.prenume', read_only=True)
+    client_denumire = serializers.CharField(source='client.denumire', read_only=True)
+    
+    class Meta:
+        model = EcoFinMonthlyReport
+        fields = [
+            'id', 'worker', 'worker_nume', 'worker_prenume',
+            'client', 'client_denumire',
+            'year', 'month',
+            'hours_worked', 'profit_brut',
+            'is_validated',
+            'created_at'
+        ]
 
 
 # ==========================================
@@ -273,13 +261,14 @@ class BillingInvoiceLineSerializer(serializers.ModelSerializer):
 
 class BillingInvoiceSerializer(serializers.ModelSerializer):
     """Serializer pentru facturi."""
-    client_denumire = serializers.SerializerMethodField()
-    client_cif = serializers.SerializerMethodField()
+    client_denumire = serializers.CharField(source='client.denumire', read_only=True, default=None)
+    # Client păstrează CIF-ul în câmpul cod_fiscal
+    client_cif = serializers.CharField(source='client.cod_fiscal', read_only=True, default=None)
     invoice_number_display = serializers.ReadOnlyField()
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     payment_status_display = serializers.CharField(source='get_payment_status_display', read_only=True)
     lines = BillingInvoiceLineSerializer(many=True, read_only=True)
-    created_by_username = serializers.SerializerMethodField()
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True, default=None)
     
     class Meta:
         model = BillingInvoice
@@ -308,19 +297,10 @@ class BillingInvoiceSerializer(serializers.ModelSerializer):
             'last_email_sent_at', 'email_sent_to', 'email_sent_count'
         ]
 
-    def get_client_denumire(self, obj):
-        return obj.client.denumire if obj.client else None
-
-    def get_client_cif(self, obj):
-        return obj.client.cif if obj.client else None
-
-    def get_created_by_username(self, obj):
-        return obj.created_by.username if obj.created_by else None
-
 
 class BillingInvoiceListSerializer(serializers.ModelSerializer):
     """Serializer simplificat pentru lista de facturi."""
-    client_denumire = serializers.SerializerMethodField()
+    client_denumire = serializers.CharField(source='client.denumire', read_only=True, default=None)
     invoice_number_display = serializers.ReadOnlyField()
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     payment_status_display = serializers.CharField(source='get_payment_status_display', read_only=True)
@@ -340,13 +320,10 @@ class BillingInvoiceListSerializer(serializers.ModelSerializer):
             'created_at'
         ]
 
-    def get_client_denumire(self, obj):
-        return obj.client.denumire if obj.client else None
-
 
 class BillingSyncLogSerializer(serializers.ModelSerializer):
     """Serializer pentru log-uri de sincronizare."""
-    user_username = serializers.SerializerMethodField()
+    user_username = serializers.CharField(source='user.username', read_only=True, default=None)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     
     class Meta:
@@ -360,14 +337,24 @@ class BillingSyncLogSerializer(serializers.ModelSerializer):
             'result_counts', 'error_message'
         ]
 
-    def get_user_username(self, obj):
-        return obj.user.username if obj.user else None
+
+class BillingSyncLogSummarySerializer(BillingSyncLogSerializer):
+    """Variantă compactă (fără interval și error_message) pentru liste."""
+    
+    class Meta(BillingSyncLogSerializer.Meta):
+        fields = [
+            'id',
+            'sync_started_at', 'sync_finished_at',
+            'user', 'user_username',
+            'status', 'status_display',
+            'result_counts'
+        ]
 
 
 class BillingEmailLogSerializer(serializers.ModelSerializer):
     """Serializer pentru log-uri de email."""
-    sent_by_username = serializers.SerializerMethodField()
-    invoice_number = serializers.SerializerMethodField()
+    sent_by_username = serializers.CharField(source='sent_by.username', read_only=True, default=None)
+    invoice_number = serializers.CharField(source='invoice.invoice_number_display', read_only=True, default=None)
     
     class Meta:
         model = BillingEmailLog
@@ -378,12 +365,6 @@ class BillingEmailLogSerializer(serializers.ModelSerializer):
             'status', 'error_message'
         ]
 
-    def get_sent_by_username(self, obj):
-        return obj.sent_by.username if obj.sent_by else None
-
-    def get_invoice_number(self, obj):
-        return obj.invoice.invoice_number_display if obj.invoice else None
-
 
 # ==========================================
 # REQUEST/RESPONSE SERIALIZERS
@@ -407,8 +388,21 @@ class IssueInvoiceRequestSerializer(serializers.Serializer):
     issue_difference = serializers.BooleanField(required=False, default=False)
 
 
+class InvoicePreviewLineSerializer(serializers.Serializer):
+    """Linie de factură din preview (sume ca numere, rotunjite la 2 zecimale)."""
+    description = serializers.CharField()
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False)
+    unit_price = serializers.DecimalField(max_digits=12, decimal_places=2, coerce_to_string=False)
+    vat_rate = serializers.DecimalField(max_digits=5, decimal_places=2, coerce_to_string=False)
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2, coerce_to_string=False)
+    line_vat = serializers.DecimalField(max_digits=12, decimal_places=2, coerce_to_string=False)
+
+
 class InvoicePreviewSerializer(serializers.Serializer):
-    """Serializer pentru preview factură înainte de emitere."""
+    """
+    Serializer pentru preview factură înainte de emitere.
+    Sumele sunt returnate ca numere JSON (frontend-ul le compară numeric).
+    """
     client_id = serializers.IntegerField()
     client_name = serializers.CharField()
     year = serializers.IntegerField()
@@ -416,21 +410,21 @@ class InvoicePreviewSerializer(serializers.Serializer):
     month_name = serializers.CharField()
     
     # Date calculate
-    total_hours = serializers.DecimalField(max_digits=10, decimal_places=2)
-    hourly_rate = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total_hours = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False)
+    hourly_rate = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False)
     
     # Linii factură
-    lines = serializers.ListField(child=serializers.DictField())
+    lines = InvoicePreviewLineSerializer(many=True)
     
     # Totaluri
-    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
-    vat_rate = serializers.DecimalField(max_digits=5, decimal_places=2)
-    vat_total = serializers.DecimalField(max_digits=12, decimal_places=2)
-    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, coerce_to_string=False)
+    vat_rate = serializers.DecimalField(max_digits=5, decimal_places=2, coerce_to_string=False)
+    vat_total = serializers.DecimalField(max_digits=12, decimal_places=2, coerce_to_string=False)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2, coerce_to_string=False)
     
     # Facturi existente pentru aceeași lună
     existing_invoices = serializers.ListField(child=serializers.DictField())
-    already_billed_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    already_billed_amount = serializers.DecimalField(max_digits=12, decimal_places=2, coerce_to_string=False)
     
     # Avertismente/info
     warnings = serializers.ListField(child=serializers.CharField())
@@ -451,6 +445,16 @@ class SendEmailRequestSerializer(serializers.Serializer):
     email_to = serializers.EmailField(required=False)  # Opțional, default din client
 
 
+class SendBulkEmailRequestSerializer(serializers.Serializer):
+    """Serializer pentru trimiterea mai multor facturi pe email."""
+    invoice_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1
+    )
+    # Opțional; implicit ultimul destinatar al facturii
+    email_to = serializers.EmailField(required=False)
+
+
 class BillingReportFilterSerializer(serializers.Serializer):
     """Serializer pentru filtrele de raport facturare."""
     year = serializers.IntegerField(required=False)
@@ -461,4 +465,4 @@ class BillingReportFilterSerializer(serializers.Serializer):
         required=False,
         default='all'
     )
-    last_months = serializers.IntegerField(required=False, min_value=1, max_value=12)
+    last_months = serializers.IntegerField(required=False, min_value=0, max_value=12)  # 0 = toate lunile
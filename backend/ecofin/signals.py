@@ -0,0 +1,26 @@
+"""
+Signals pentru Eco-Fin.
+Invalidează rapoartele de facturare din cache la modificarea facturilor
+sau a clienților (raportul sumar conține și denumirea clientului).
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from iss.models import Client
+from .models import BillingInvoice
+from .cache import invalidate_billing_reports
+
+
+@receiver(post_save, sender=BillingInvoice)
+@receiver(post_delete, sender=BillingInvoice)
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_billing_report_cache(sender, instance, **kwargs):
+    """
+    Orice factură sau client salvat/șters schimbă rapoartele sumare.
+    Versiunea se schimbă abia după commit, ca un raport calculat concurent
+    din datele vechi să nu rămână în cache sub versiunea nouă.
+    """
+    transaction.on_commit(invalidate_billing_reports)
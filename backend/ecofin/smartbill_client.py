@@ -9,10 +9,13 @@ Acest modul gestionează comunicarea cu SmartBill pentru:
 """
 import os
 import base64
+import threading
 import requests
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator
 from django.conf import settings
 
 
@@ -51,6 +54,20 @@ class SmartBillClient:
                 "SmartBill credentials incomplete. Required: SMARTBILL_USERNAME, "
                 "SMARTBILL_TOKEN, SMARTBILL_COMPANY_CIF"
             )
+        
+        # Sesiunile HTTP (keep-alive) sunt per fir de execuție: clientul e
+        # partajat în proces, iar requests.Session nu este thread-safe
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """Sesiunea HTTP reutilizată a firului curent."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+            self._local.session = session
+        return session
     
     def _get_auth_header(self) -> str:
         """Generează header-ul de autorizare Basic Auth."""
@@ -76,7 +93,7 @@ class SmartBillClient:
         }
         
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -103,9 +120,14 @@ class SmartBillClient:
         except requests.RequestException as e:
             raise SmartBillError(f"Network error: {str(e)}")
     
-    def _make_request_binary(self, endpoint: str, params: dict = None) -> bytes:
+    def _iter_request_binary(
+        self,
+        endpoint: str,
+        params: dict = None,
+        chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
         """
-        Execută o cerere pentru descărcare fișier binar (PDF).
+        Descarcă un fișier binar (PDF) în bucăți, fără a-l ține integral în memorie.
         """
         url = f"{self.BASE_URL}/{endpoint}"
         headers = {
@@ -114,21 +136,23 @@ class SmartBillClient:
         }
         
         try:
-            response = requests.get(
+            with self.session.get(
                 url=url,
                 headers=headers,
                 params=params,
-                timeout=60
-            )
-            
-            if response.status_code >= 400:
-                raise SmartBillError(
-                    f"SmartBill API error downloading file: {response.status_code}",
-                    status_code=response.status_code
-                )
-            
-            return response.content
-            
+                timeout=60,
+                stream=True
+            ) as response:
+                if response.status_code >= 400:
+                    raise SmartBillError(
+                        f"SmartBill API error downloading file: {response.status_code}",
+                        status_code=response.status_code
+                    )
+                
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        yield chunk
+                        
         except requests.RequestException as e:
             raise SmartBillError(f"Network error downloading file: {str(e)}")
     
@@ -223,16 +247,17 @@ class SmartBillClient:
             "url": result.get("url", "")
         }
     
-    def get_invoice_pdf(self, series: str, number: str) -> bytes:
+    def iter_invoice_pdf(self, series: str, number: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
         """
-        Descarcă PDF-ul unei facturi.
+        Descarcă PDF-ul unei facturi în bucăți (streaming).
         
         Args:
             series: Seria facturii
             number: Numărul facturii
+            chunk_size: Dimensiunea unei bucăți (bytes)
         
         Returns:
-            Conținutul PDF ca bytes
+            Iterator peste conținutul PDF
         """
         params = {
             "cif": self.company_cif,
@@ -240,7 +265,7 @@ class SmartBillClient:
             "number": number
         }
         
-        return self._make_request_binary("invoice/pdf", params=params)
+        return self._iter_request_binary("invoice/pdf", params=params, chunk_size=chunk_size)
     
     def get_invoice_status(self, series: str, number: str) -> dict:
         """
@@ -333,13 +358,20 @@ class SmartBillClient:
             }
 
 
+@lru_cache(maxsize=1)
+def _shared_smartbill_client() -> SmartBillClient:
+    """Instanța unică per proces (excepțiile nu sunt puse în cache)."""
+    return SmartBillClient()
+
+
 def get_smartbill_client() -> Optional[SmartBillClient]:
     """
     Factory function pentru obținerea clientului SmartBill.
+    Clientul (și sesiunea HTTP) este refolosit în cadrul procesului.
     Returnează None dacă credentials nu sunt configurate.
     """
     try:
-        return SmartBillClient()
+        return _shared_smartbill_client()
     except SmartBillError:
         return None
 
@@ -0,0 +1,772 @@
+"""
+Teste pentru modulul Eco-Fin.
+Testează modelele, view-urile de import/rapoarte, facturarea și admin-ul.
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+import openpyxl
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, models
+from django.core.exceptions import PermissionDenied
+from django.test import TestCase, RequestFactory, override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from iss.models import Client, Worker
+from .admin import EcoFinImportedRowAdmin, EcoFinMonthlyReportAdmin
+from .billing_views import _last_months_q
+from .cache import billing_report_cache_version
+from .smartbill_client import SmartBillClient, SmartBillError
+from .models import (
+    _copy_value,
+    EcoFinMonthlyReport, EcoFinSettings, EcoFinImportBatch, EcoFinImportedRow,
+    EcoFinProcessedRecord, BillingInvoice, BillingEmailLog,
+)
+
+
+# =============================================================================
+# TESTE PENTRU MODELUL DEPRECIAT (EcoFinMonthlyReport)
+# =============================================================================
+
+
+class LegacyReportReadOnlyTest(APITestCase):
+    """Teste pentru ECOFIN_LEGACY_READONLY pe rapoartele vechi."""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@test.com', 'admin123')
+        self.client.force_authenticate(user=self.user)
+        self.client_obj = Client.objects.create(denumire='Client Vechi')
+        self.worker = Worker.objects.create(nume='Pop', prenume='Ion', pasaport_nr='RO100')
+        self.report = EcoFinMonthlyReport.objects.create(
+            worker=self.worker, client=self.client_obj, year=2025, month=1,
+            hours_worked=Decimal('10'), tarif_orar=Decimal('30'), salary_cost=Decimal('100')
+        )
+
+    def test_writes_allowed_without_flag(self):
+        """Fără flag, rapoartele se salvează și profitul se calculează."""
+        self.report.notes = 'ok'
+        self.report.save()
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.profit_brut, Decimal('200.00'))
+
+    @override_settings(ECOFIN_LEGACY_READONLY=True)
+    def test_save_and_delete_raise(self):
+        """save() și delete() ridică PermissionDenied, nu ignoră scrierea."""
+        self.report.notes = 'x'
+        with self.assertRaises(PermissionDenied):
+            self.report.save()
+        with self.assertRaises(PermissionDenied):
+            self.report.delete()
+        self.assertTrue(EcoFinMonthlyReport.objects.filter(pk=self.report.pk).exists())
+
+    @override_settings(ECOFIN_LEGACY_READONLY=True)
+    def test_queryset_writes_raise(self):
+        """update(), delete(), bulk_create() și bulk_update() sunt blocate."""
+        qs = EcoFinMonthlyReport.objects.all()
+        with self.assertRaises(PermissionDenied):
+            qs.update(notes='x')
+        with self.assertRaises(PermissionDenied):
+            qs.delete()
+        with self.assertRaises(PermissionDenied):
+            EcoFinMonthlyReport.objects.bulk_create([EcoFinMonthlyReport(
+                worker=self.worker, client=self.client_obj, year=2025, month=2
+            )])
+        with self.assertRaises(PermissionDenied):
+            EcoFinMonthlyReport.objects.bulk_update([self.report], ['notes'])
+        self.assertEqual(EcoFinMonthlyReport.objects.count(), 1)
+
+    @override_settings(ECOFIN_LEGACY_READONLY=True)
+    def test_related_deletes_raise(self):
+        """Ștergerile în cascadă / SET_NULL din Worker, Client și User sunt blocate."""
+        with self.settings(ECOFIN_LEGACY_READONLY=False):
+            EcoFinMonthlyReport.objects.filter(pk=self.report.pk).update(created_by=self.user)
+        with self.assertRaises(PermissionDenied):
+            self.worker.delete()
+        with self.assertRaises(PermissionDenied):
+            self.client_obj.delete()
+        with self.assertRaises(PermissionDenied):
+            self.user.delete()
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.created_by, self.user)
+
+        # Utilizatorii fără rapoarte vechi se pot șterge în continuare
+        other = User.objects.create_user('altul', 'altul@test.com', 'x')
+        other.delete()
+        self.assertFalse(User.objects.filter(pk=other.pk).exists())
+
+    def test_related_deletes_cascade_without_flag(self):
+        """Fără flag, ștergerea lucrătorului șterge și rapoartele lui."""
+        self.worker.delete()
+        self.assertFalse(EcoFinMonthlyReport.objects.filter(pk=self.report.pk).exists())
+
+    @override_settings(ECOFIN_LEGACY_READONLY=True)
+    def test_api_is_read_only(self):
+        """API-ul de compatibilitate permite doar citirea."""
+        url = f'/api/eco-fin/reports/{self.report.pk}/'
+        self.assertEqual(self.client.get('/api/eco-fin/reports/').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        response = self.client.post('/api/eco-fin/reports/', {
+            'worker': self.worker.pk, 'client': self.client_obj.pk, 'year': 2025, 'month': 3
+        })
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.patch(url, {'notes': 'x'}).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(EcoFinMonthlyReport.objects.count(), 1)
+
+    @override_settings(ECOFIN_LEGACY_READONLY=True)
+    def test_admin_has_no_write_permissions(self):
+        """Admin-ul nu permite adăugare, editare sau ștergere."""
+        model_admin = EcoFinMonthlyReportAdmin(EcoFinMonthlyReport, admin.site)
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertFalse(model_admin.has_add_permission(request))
+        self.assertFalse(model_admin.has_change_permission(request, self.report))
+        self.assertFalse(model_admin.has_delete_permission(request, self.report))
+
+    def test_admin_write_permissions_without_flag(self):
+        """Fără flag, admin-ul păstrează regulile existente."""
+        model_admin = EcoFinMonthlyReportAdmin(EcoFinMonthlyReport, admin.site)
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertTrue(model_admin.has_add_permission(request))
+        self.assertTrue(model_admin.has_change_permission(request, self.report))
+
+
+# =============================================================================
+# TESTE PENTRU IMPORT
+# =============================================================================
+
+
+def make_import_file(rows, headers=('nr_cim', 'nume', 'prenume', 'salariu', 'lucrat', 'cam')):
+    """Construiește un fișier Excel de import în memorie."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(list(headers))
+    for row in rows:
+        ws.append(list(row))
+    content = BytesIO()
+    wb.save(content)
+    return SimpleUploadedFile(
+        'import.xlsx', content.getvalue(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+
+class ImportTestMixin:
+    """Date comune pentru testele de import."""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@test.com', 'admin123')
+        self.client.force_authenticate(user=self.user)
+        self.client_obj = Client.objects.create(
+            denumire='Client Import', tarif_orar=Decimal('30.00'),
+            cazare_cost=Decimal('100.00'), masa_cost=Decimal('50.00'), transport_cost=Decimal('20.00')
+        )
+        self.worker1 = Worker.objects.create(
+            nume='Pop', prenume='Ion', pasaport_nr='IMP1', cim_nr='CIM-1', client=self.client_obj
+        )
+        self.worker2 = Worker.objects.create(
+            nume='Rus', prenume='Ana', pasaport_nr='IMP2', cim_nr='CIM-2', client=self.client_obj
+        )
+        self.worker_fara_client = Worker.objects.create(
+            nume='Fara', prenume='Client', pasaport_nr='IMP3', cim_nr='CIM-3'
+        )
+        EcoFinSettings.objects.create(
+            year=2025, month=1, cheltuieli_indirecte=Decimal('1000.00'), cost_concediu=Decimal('10.00')
+        )
+
+    def upload(self, rows):
+        return self.client.post('/api/eco-fin/import/upload/', {
+            'file': make_import_file(rows), 'year': 2025, 'month': 1
+        }, format='multipart')
+
+
+class ImportBatchStatsTest(ImportTestMixin, APITestCase):
+    """Contoarele batch-ului sunt derivate din rândurile importate."""
+
+    def test_upload_and_process_counters(self):
+        """upload() și process_import() folosesc refresh_stats()."""
+        response = self.upload([
+            ('CIM-1', 'Pop', 'Ion', 3000, 160, 100),
+            ('cim-2', 'Rus', 'Ana', 3000, 160, 100),
+            ('CIM-3', 'Fara', 'Client', 3000, 160, 100),
+            ('CIM-X', 'Nu', 'Exista', 3000, 160, 100),
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        batch = EcoFinImportBatch.objects.get(pk=response.data['batch_id'])
+        rows = batch.rows.all()
+        self.assertEqual(batch.total_rows, rows.count())
+        self.assertEqual(batch.matched_rows, rows.filter(status=EcoFinImportedRow.Status.MATCHED).count())
+        self.assertEqual(batch.error_rows, rows.filter(status=EcoFinImportedRow.Status.ERROR).count())
+        self.assertEqual((batch.total_rows, batch.matched_rows, batch.error_rows), (4, 2, 2))
+        self.assertEqual(
+            (response.data['total_rows'], response.data['matched_rows'], response.data['error_rows']),
+            (4, 2, 2)
+        )
+
+        response = self.client.post('/api/eco-fin/import/process/', {
+            'batch_id': batch.id, 'year': 2025, 'month': 1, 'rows': response.data['preview']
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['created_records'], 2)
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, EcoFinImportBatch.Status.VALIDATED)
+        self.assertEqual(batch.processed_rows, 2)
+        self.assertEqual(batch.matched_rows, 2)
+        self.assertEqual(batch.error_rows, 2)
+        self.assertEqual(EcoFinProcessedRecord.objects.filter(year=2025, month=1).count(), 2)
+
+
+    def test_process_reports_rows_lost_to_concurrent_import(self):
+        """Rândurile ignorate de ignore_conflicts apar ca erori, nu ca procesate."""
+        response = self.upload([
+            ('CIM-1', 'Pop', 'Ion', 3000, 160, 100),
+            ('CIM-2', 'Rus', 'Ana', 3000, 160, 100),
+        ])
+        batch_id = response.data['batch_id']
+        other_user = User.objects.create_user('altul', 'altul@test.com', 'x')
+        real_bulk_create = EcoFinProcessedRecord.objects.bulk_create
+
+        def concurrent_bulk_create(records, **kwargs):
+            # Înregistrarea pentru worker2 a fost creată între timp în afara importului
+            EcoFinProcessedRecord.objects.create(
+                worker=self.worker2, client=self.client_obj, year=2025, month=1,
+                nr_cim='CIM-2', created_by=other_user
+            )
+            return real_bulk_create(records, **kwargs)
+
+        with mock.patch.object(EcoFinProcessedRecord.objects, 'bulk_create', concurrent_bulk_create):
+            response = self.client.post('/api/eco-fin/import/process/', {
+                'batch_id': batch_id, 'year': 2025, 'month': 1, 'rows': response.data['preview']
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['created_records'], 1)
+        self.assertEqual([error['nr_cim'] for error in response.data['errors']], ['CIM-2'])
+        rows = {row.nr_cim: row.status for row in EcoFinImportedRow.objects.filter(batch_id=batch_id)}
+        self.assertEqual(rows, {
+            'CIM-1': EcoFinImportedRow.Status.PROCESSED, 'CIM-2': EcoFinImportedRow.Status.MATCHED
+        })
+        batch = EcoFinImportBatch.objects.get(pk=batch_id)
+        self.assertEqual(batch.status, EcoFinImportBatch.Status.FAILED)
+        self.assertEqual(batch.processed_rows, 1)
+
+    def test_process_locks_month_settings(self):
+        """Importurile pentru aceeași lună se serializează pe rândul de setări."""
+        first = self.upload([('CIM-1', 'Pop', 'Ion', 3000, 160, 100)])
+        second = self.upload([('CIM-2', 'Rus', 'Ana', 3000, 160, 100)])
+        real_select_for_update = EcoFinSettings.objects.select_for_update
+        with mock.patch.object(
+            EcoFinSettings.objects, 'select_for_update', side_effect=real_select_for_update
+        ) as select_for_update:
+            for response in (first, second):
+                response = self.client.post('/api/eco-fin/import/process/', {
+                    'batch_id': response.data['batch_id'], 'year': 2025, 'month': 1,
+                    'rows': response.data['preview']
+                }, format='json')
+                # Același utilizator: al doilea import nu numără rândurile primului
+                self.assertEqual(response.data['created_records'], 1)
+                self.assertEqual(response.data['errors'], [])
+        self.assertEqual(select_for_update.call_count, 2)
+        self.assertEqual(
+            list(EcoFinProcessedRecord.objects.values_list('nr_cim', flat=True)), ['CIM-2']
+        )
+
+
+class BulkInsertTest(ImportTestMixin, APITestCase):
+    """EcoFinImportedRow.bulk_insert: bulk_create sub prag, COPY peste prag."""
+
+    def make_rows(self):
+        self.batch = EcoFinImportBatch.objects.create(
+            year=2025, month=1, filename='import.xlsx', imported_by=self.user
+        )
+        return [
+            EcoFinImportedRow(
+                batch=self.batch, row_number=2, nr_cim='CIM-1', nume='Pop', prenume='Ion',
+                salariu_brut=Decimal('3000.50'), status=EcoFinImportedRow.Status.MATCHED,
+                worker=self.worker1, client=self.client_obj, year=2025, month=1
+            ),
+            EcoFinImportedRow(
+                batch=self.batch, row_number=3, nr_cim='CIM-X', nume='Nu, "Exista"',
+                status=EcoFinImportedRow.Status.ERROR, error_message='nu a fost găsit',
+                year=2025, month=1
+            ),
+        ]
+
+    def test_bulk_create_below_threshold(self):
+        """Sub prag rândurile se salvează cu bulk_create."""
+        EcoFinImportedRow.bulk_insert(self.make_rows())
+        saved = list(self.batch.rows.order_by('row_number').values_list('nr_cim', 'worker_id', 'salariu_brut'))
+        self.assertEqual(saved, [
+            ('CIM-1', self.worker1.id, Decimal('3000.50')), ('CIM-X', None, Decimal('0.00'))
+        ])
+
+    @override_settings(ECOFIN_IMPORT_COPY_THRESHOLD=1)
+    def test_copy_above_threshold(self):
+        """Peste prag rândurile se trimit prin COPY (fără pk pe instanțe)."""
+        rows = self.make_rows()
+        if connection.vendor == 'postgresql':
+            EcoFinImportedRow.bulk_insert(rows)
+            saved = list(self.batch.rows.order_by('row_number').values_list('nr_cim', 'nume', 'worker_id'))
+            self.assertEqual(saved, [('CIM-1', 'Pop', self.worker1.id), ('CIM-X', 'Nu, "Exista"', None)])
+        else:
+            # Fără PostgreSQL verificăm conținutul trimis la COPY
+            cursor = mock.MagicMock()
+            with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                    mock.patch.object(connection, 'cursor', return_value=cursor):
+                EcoFinImportedRow.bulk_insert(rows)
+            sql, buffer = cursor.__enter__.return_value.copy_expert.call_args[0]
+            self.assertTrue(sql.startswith('COPY '))
+            columns = [column.strip(' "') for column in sql.split('(', 1)[1].split(')', 1)[0].split(',')]
+            lines = [dict(zip(columns, line)) for line in csv.reader(buffer)]
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(lines[0]['worker_id'], str(self.worker1.id))
+            self.assertEqual(lines[0]['salariu_brut'], '3000.50')
+            self.assertEqual(lines[1]['worker_id'], '\\N')
+            self.assertEqual(lines[1]['nume'], 'Nu, "Exista"')
+            self.assertEqual(lines[1]['error_message'], 'nu a fost găsit')
+        self.assertTrue(all(row.pk is None for row in rows))
+
+    def test_copy_value_formats(self):
+        """COPY primește NULL ca \\N, booleanele ca t/f și JSON serializat."""
+        self.assertEqual(_copy_value(models.CharField(), None), '\\N')
+        self.assertEqual(_copy_value(models.BooleanField(), True), 't')
+        self.assertEqual(_copy_value(models.BooleanField(), False), 'f')
+        self.assertEqual(_copy_value(models.JSONField(), {'a': [1, 'ă']}), '{"a": [1, "\\u0103"]}')
+
+
+class BatchDetailTest(ImportTestMixin, APITestCase):
+    """Teste pentru GET /import/batches/<id>/."""
+
+    def test_batch_with_rows(self):
+        """Batch-ul este returnat cu rândurile lui, în ordinea din Excel."""
+        response = self.upload([
+            ('CIM-1', 'Pop', 'Ion', 3000, 160, 100),
+            ('CIM-X', 'Nu', 'Exista', 3000, 160, 100),
+        ])
+        batch_id = response.data['batch_id']
+        response = self.client.get(f'/api/eco-fin/import/batches/{batch_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], batch_id)
+        self.assertEqual(response.data['total_rows'], 2)
+        self.assertEqual([row['nr_cim'] for row in response.data['rows']], ['CIM-1', 'CIM-X'])
+        self.assertEqual(
+            [row['status'] for row in response.data['rows']],
+            [EcoFinImportedRow.Status.MATCHED, EcoFinImportedRow.Status.ERROR]
+        )
+
+    def test_missing_batch(self):
+        """Un batch inexistent dă 404."""
+        response = self.client.get('/api/eco-fin/import/batches/999999/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ImportedRowAdminSearchTest(ImportTestMixin, APITestCase):
+    """Căutarea din admin pentru rândurile importate."""
+
+    def setUp(self):
+        super().setUp()
+        batch = EcoFinImportBatch.objects.create(
+            year=2025, month=1, filename='import.xlsx', imported_by=self.user
+        )
+        self.row_by_worker = EcoFinImportedRow.objects.create(
+            batch=batch, row_number=2, nr_cim='CIM-1', nume='Altul', prenume='Nume',
+            worker=self.worker2, year=2025, month=1
+        )
+        self.row_by_cim = EcoFinImportedRow.objects.create(
+            batch=batch, row_number=3, nr_cim='RUS-77', year=2025, month=1
+        )
+        self.row_other = EcoFinImportedRow.objects.create(
+            batch=batch, row_number=4, nr_cim='CIM-9', nume='Ionescu', year=2025, month=1
+        )
+        self.model_admin = EcoFinImportedRowAdmin(EcoFinImportedRow, admin.site)
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+
+    def search(self, term):
+        queryset, may_have_duplicates = self.model_admin.get_search_results(
+            self.request, EcoFinImportedRow.objects.all(), term
+        )
+        self.assertFalse(may_have_duplicates)
+        return set(queryset)
+
+    def test_search_own_columns_and_worker(self):
+        """Caută în nr. CIM / nume din Excel și în numele lucrătorului asociat."""
+        self.assertEqual(self.search('rus'), {self.row_by_worker, self.row_by_cim})
+        self.assertEqual(self.search('ionescu'), {self.row_other})
+        self.assertEqual(self.search('cim'), {self.row_by_worker, self.row_other})
+
+    def test_search_terms_are_combined(self):
+        """Mai mulți termeni se combină cu AND; ghilimelele păstrează spațiile."""
+        self.assertEqual(self.search('cim ana'), {self.row_by_worker})
+        self.assertEqual(self.search('"RUS-77"'), {self.row_by_cim})
+        self.assertEqual(self.search('"rus ana"'), set())
+
+# =============================================================================
+# TESTE PENTRU SETĂRI
+# =============================================================================
+
+
+class SettingsPropagationTest(ImportTestMixin, APITestCase):
+    """Modificarea setărilor se propagă la înregistrările nevalidate."""
+
+    def create_record(self, worker, **kwargs):
+        return EcoFinProcessedRecord.objects.create(
+            worker=worker, client=self.client_obj, year=2025, month=1, nr_cim=worker.cim_nr,
+            salariu_brut=Decimal('1000.00'), ore_lucrate=Decimal('100'), tarif_orar=Decimal('30.00'),
+            cota_indirecte=Decimal('1.00'), **kwargs
+        )
+
+    def test_cota_uses_unvalidated_records(self):
+        """Cota indirectă se împarte doar la înregistrările nevalidate, ca la import."""
+        record1 = self.create_record(self.worker1)
+        record2 = self.create_record(self.worker2)
+        validated = self.create_record(self.worker_fara_client, is_validated=True)
+        month_settings = EcoFinSettings.objects.get(year=2025, month=1)
+
+        response = self.client.patch(f'/api/eco-fin/settings/{month_settings.id}/', {
+            'cheltuieli_indirecte': '90.00', 'cost_concediu': '5.00'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+        for record in (record1, record2):
+            record.refresh_from_db()
+            self.assertEqual(record.cota_indirecte, Decimal('45.00'))
+            self.assertEqual(record.cost_concediu, Decimal('5.00'))
+            self.assertEqual(record.cost_salariat_total, Decimal('1050.00'))
+            self.assertEqual(record.profitabilitate, Decimal('1950.00'))
+        validated.refresh_from_db()
+        self.assertEqual(validated.cota_indirecte, Decimal('1.00'))
+
+    def test_same_cota_as_import(self):
+        """După import, resalvarea acelorași setări nu schimbă cota."""
+        response = self.upload([
+            ('CIM-1', 'Pop', 'Ion', 3000, 160, 100),
+            ('CIM-2', 'Rus', 'Ana', 3000, 160, 100),
+            ('CIM-X', 'Nu', 'Exista', 3000, 160, 100),
+        ])
+        self.client.post('/api/eco-fin/import/process/', {
+            'batch_id': response.data['batch_id'], 'year': 2025, 'month': 1,
+            'rows': response.data['preview']
+        }, format='json')
+        imported = set(EcoFinProcessedRecord.objects.values_list('cota_indirecte', flat=True))
+        self.assertEqual(imported, {Decimal('500.00')})
+
+        month_settings = EcoFinSettings.objects.get(year=2025, month=1)
+        response = self.client.patch(f'/api/eco-fin/settings/{month_settings.id}/', {
+            'cheltuieli_indirecte': '1000.00'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(set(EcoFinProcessedRecord.objects.values_list('cota_indirecte', flat=True)), imported)
+
+
+# =============================================================================
+# TESTE PENTRU FACTURARE
+# =============================================================================
+
+
+class BillingTestMixin:
+    """Facturi cu PDF salvat într-un MEDIA_ROOT temporar."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.user = User.objects.create_superuser('admin', 'admin@test.com', 'admin123')
+        self.client.force_authenticate(user=self.user)
+        self.client_obj = Client.objects.create(denumire='Client Facturare')
+
+    def create_invoice(self, month=1, with_pdf=True, year=2025, **kwargs):
+        pdf_path = ''
+        if with_pdf:
+            pdf_path = f'invoices/factura_{month}.pdf'
+            os.makedirs(os.path.join(self.media_root, 'invoices'), exist_ok=True)
+            with open(os.path.join(self.media_root, pdf_path), 'wb') as pdf:
+                pdf.write(b'%PDF-1.4 test')
+        kwargs.setdefault('client', self.client_obj)
+        return BillingInvoice.objects.create(
+            year=year, month=month, subtotal=Decimal('100.00'), vat_total=Decimal('19.00'),
+            total=Decimal('119.00'), pdf_path=pdf_path, **kwargs
+        )
+
+
+class SendBulkEmailTest(BillingTestMixin, APITestCase):
+    """Teste pentru POST /billing/invoices/send-bulk/."""
+
+    url = '/api/eco-fin/billing/invoices/send-bulk/'
+
+    def test_recipient_override_and_last_recipient(self):
+        """Destinatarul implicit este ultimul destinatar al facturii."""
+        previous = self.create_invoice(month=1, email_sent_to='vechi@client.ro')
+        no_recipient = self.create_invoice(month=2)
+        no_pdf = self.create_invoice(month=3, with_pdf=False, email_sent_to='x@client.ro')
+
+        response = self.client.post(self.url, {
+            'invoice_ids': [previous.id, no_recipient.id, no_pdf.id]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['sent_count'], 1)
+        self.assertEqual({item['id'] for item in response.data['skipped']}, {no_recipient.id, no_pdf.id})
+        self.assertEqual([message.to for message in mail.outbox], [['vechi@client.ro']])
+        previous.refresh_from_db()
+        self.assertEqual(previous.email_sent_count, 1)
+
+        response = self.client.post(self.url, {
+            'invoice_ids': [previous.id, no_recipient.id], 'email_to': 'nou@client.ro'
+        }, format='json')
+        self.assertEqual(response.data['sent_count'], 2)
+        self.assertEqual(mail.outbox[-1].to, ['nou@client.ro'])
+        self.assertEqual(BillingEmailLog.objects.filter(status='sent').count(), 3)
+
+    @override_settings(BILLING_EMAIL_BATCH_SIZE=2)
+    def test_connection_failure_fails_whole_batch(self):
+        """Dacă conexiunea SMTP nu se deschide, tot lotul este logat ca eșuat."""
+        invoices = [self.create_invoice(month=month) for month in (1, 2, 3)]
+        connection = mock.Mock()
+        connection.open.side_effect = [OSError('SMTP indisponibil'), None]
+
+        with mock.patch('ecofin.billing_views.get_connection', return_value=connection):
+            with mock.patch('ecofin.billing_views.EmailMessage') as email_message:
+                response = self.client.post(self.url, {
+                    'invoice_ids': [invoice.id for invoice in invoices], 'email_to': 'a@client.ro'
+                }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertFalse(response.data['success'])
+        self.assertEqual(response.data['sent_count'], 1)
+        self.assertEqual(len(response.data['failed']), 2)
+        self.assertEqual(email_message.call_count, 1)
+        failed_logs = BillingEmailLog.objects.filter(status='failed')
+        self.assertEqual(failed_logs.count(), 2)
+        self.assertTrue(all(log.error_message == 'SMTP indisponibil' for log in failed_logs))
+        self.assertEqual(connection.close.call_count, 1)
+
+
+
+
+class DownloadPdfTest(BillingTestMixin, APITestCase):
+    """Teste pentru GET /billing/invoices/<id>/pdf/."""
+
+    def test_local_file(self):
+        """PDF-ul salvat local este servit cu FileResponse."""
+        invoice = self.create_invoice()
+        response = self.client.get(f'/api/eco-fin/billing/invoices/{invoice.id}/pdf/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 test')
+
+    def test_streams_from_smartbill(self):
+        """Fără PDF local, PDF-ul din SmartBill este transmis în bucăți."""
+        invoice = self.create_invoice(with_pdf=False, smartbill_series='ISS', smartbill_number='0001')
+        smartbill = mock.Mock()
+        smartbill.iter_invoice_pdf.return_value = iter([b'%PDF-', b'1.4'])
+        with mock.patch('ecofin.billing_views.get_smartbill_client', return_value=smartbill):
+            response = self.client.get(f'/api/eco-fin/billing/invoices/{invoice.id}/pdf/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.streaming)
+            self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4')
+        smartbill.iter_invoice_pdf.assert_called_once_with(series='ISS', number='0001')
+
+    def test_smartbill_error_returns_404(self):
+        """O eroare SmartBill înainte de primul bloc dă 404."""
+        invoice = self.create_invoice(with_pdf=False, smartbill_series='ISS', smartbill_number='0002')
+
+        def failing_download(**kwargs):
+            raise SmartBillError('SmartBill API error downloading file: 500', status_code=500)
+            yield b''
+
+        smartbill = mock.Mock()
+        smartbill.iter_invoice_pdf.side_effect = failing_download
+        with mock.patch('ecofin.billing_views.get_smartbill_client', return_value=smartbill):
+            response = self.client.get(f'/api/eco-fin/billing/invoices/{invoice.id}/pdf/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class IssueInvoiceTest(BillingTestMixin, APITestCase):
+    """Teste pentru POST /billing/invoices/issue/."""
+
+    def test_pdf_failure_is_logged_and_invoice_kept(self):
+        """Factura emisă rămâne salvată; eroarea la PDF este logată."""
+        smartbill = mock.Mock()
+        smartbill.issue_invoice.return_value = {'series': 'ISS', 'number': '0005'}
+        smartbill.iter_invoice_pdf.side_effect = SmartBillError('Network error downloading file: timeout')
+        with mock.patch('ecofin.billing_views.get_smartbill_client', return_value=smartbill):
+            with self.assertLogs('ecofin.billing_views', level='WARNING') as logs:
+                response = self.client.post('/api/eco-fin/billing/invoices/issue/', {
+                    'client_id': self.client_obj.id, 'year': 2025, 'month': 1,
+                    'confirm_hours_agreed': True
+                }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertIn('timeout', logs.output[0])
+        invoice = BillingInvoice.objects.get(smartbill_series='ISS', smartbill_number='0005')
+        self.assertEqual(invoice.pdf_path, '')
+
+
+class InvoicePreviewTest(BillingTestMixin, APITestCase):
+    """Teste pentru POST /billing/invoices/preview/."""
+
+    def test_lines_are_rounded_numbers(self):
+        """Liniile din preview au sumele ca numere, rotunjite la 2 zecimale."""
+        self.client_obj.tarif_orar = Decimal('25.55')
+        self.client_obj.save()
+        worker = Worker.objects.create(nume='Pop', prenume='Ion', pasaport_nr='PRV1', client=self.client_obj)
+        EcoFinProcessedRecord.objects.create(
+            worker=worker, client=self.client_obj, year=2025, month=1, nr_cim='CIM-P',
+            ore_lucrate=Decimal('170.50'), tarif_orar=Decimal('25.55')
+        )
+        response = self.client.post('/api/eco-fin/billing/invoices/preview/', {
+            'client_id': self.client_obj.id, 'year': 2025, 'month': 1
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        body = response.json()
+        self.assertEqual(len(body['lines']), 1)
+        line = body['lines'][0]
+        self.assertEqual(line['description'], 'PRESTARI SERVICII IANUARIE 2025')
+        self.assertEqual(line['quantity'], 1.0)
+        self.assertEqual(line['unit_price'], body['subtotal'])
+        self.assertEqual(line['line_vat'], body['vat_total'])
+        self.assertEqual(body['subtotal'], 4356.28)
+        for key in ('quantity', 'unit_price', 'vat_rate', 'line_total', 'line_vat'):
+            self.assertIsInstance(line[key], float)
+            self.assertEqual(line[key], round(line[key], 2))
+
+
+class ExportCsvTest(BillingTestMixin, APITestCase):
+    """Teste pentru GET /billing/export/csv/."""
+
+    def read_csv(self, response):
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'))
+        return list(csv.reader(content[1:].splitlines()))
+
+    def test_exports_issued_invoices(self):
+        """Doar facturile emise, cele mai noi primele, cu antetul și etichetele de status."""
+        self.create_invoice(
+            month=1, with_pdf=False, status=BillingInvoice.InvoiceStatus.ISSUED,
+            smartbill_series='ISS', smartbill_number='0001'
+        )
+        self.create_invoice(
+            month=2, with_pdf=False, status=BillingInvoice.InvoiceStatus.ISSUED,
+            smartbill_series='ISS', smartbill_number='0002', paid_amount=Decimal('119.00')
+        )
+        self.create_invoice(month=3, with_pdf=False)  # draft, nu apare
+
+        response = self.client.get('/api/eco-fin/billing/export/csv/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = self.read_csv(response)
+        self.assertEqual(rows[0][:3], ['Nr.', 'Client', 'Serie/Număr'])
+        self.assertEqual([row[2] for row in rows[1:]], ['ISS0002', 'ISS0001'])
+        self.assertEqual([row[0] for row in rows[1:]], ['1', '2'])
+        self.assertEqual([row[-1] for row in rows[1:]], ['Încasată', 'Neîncasată'])
+        self.assertEqual(rows[1][1], 'Client Facturare')
+
+    def test_filters(self):
+        """Filtrele (month, payment_status) se aplică și exportului."""
+        self.create_invoice(month=1, with_pdf=False, status=BillingInvoice.InvoiceStatus.ISSUED)
+        self.create_invoice(month=2, with_pdf=False, status=BillingInvoice.InvoiceStatus.ISSUED)
+        rows = self.read_csv(self.client.get('/api/eco-fin/billing/export/csv/', {'month': 2}))
+        self.assertEqual([row[4] for row in rows[1:]], ['2'])
+        rows = self.read_csv(self.client.get('/api/eco-fin/billing/export/csv/', {'payment_status': 'paid'}))
+        self.assertEqual(rows[1:], [])
+
+
+class BillingSummaryCacheTest(BillingTestMixin, APITestCase):
+    """Invalidarea cache-ului pentru GET /billing/reports/summary/."""
+
+    url = '/api/eco-fin/billing/reports/summary/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_invoice_change_invalidates_after_commit(self):
+        """Versiunea se schimbă abia după commit-ul tranzacției."""
+        version = billing_report_cache_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_invoice(month=1, with_pdf=False, status=BillingInvoice.InvoiceStatus.ISSUED)
+            self.assertEqual(billing_report_cache_version(), version)
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertNotEqual(billing_report_cache_version(), version)
+
+    def test_client_rename_refreshes_summary(self):
+        """Redenumirea clientului apare în raportul sumar deja pus în cache."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_invoice(month=1, with_pdf=False, status=BillingInvoice.InvoiceStatus.ISSUED)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['by_client'][0]['client_name'], 'Client Facturare')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_obj.denumire = 'Client Redenumit'
+            self.client_obj.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['by_client'][0]['client_name'], 'Client Redenumit')
+
+
+class LastMonthsFilterTest(BillingTestMixin, APITestCase):
+    """Filtrul last_months pentru listă, raportul sumar și exporturi."""
+
+    def test_last_months_q_across_year(self):
+        """Intervalul peste schimbarea anului acoperă exact ultimele N luni."""
+        for year, month in ((2024, 10), (2024, 11), (2024, 12), (2025, 1), (2025, 2)):
+            self.create_invoice(month=month, with_pdf=False, year=year)
+        months = BillingInvoice.objects.filter(_last_months_q(3, today=date(2025, 2, 15)))
+        self.assertEqual(
+            sorted(months.values_list('year', 'month')), [(2024, 12), (2025, 1), (2025, 2)]
+        )
+        months = BillingInvoice.objects.filter(_last_months_q(2, today=date(2025, 12, 1)))
+        self.assertFalse(months.exists())
+
+    def test_invalid_last_months_returns_400(self):
+        """Valorile invalide dau 400 pe listă, raport și exporturi."""
+        urls = [
+            '/api/eco-fin/billing/invoices/', '/api/eco-fin/billing/reports/summary/',
+            '/api/eco-fin/billing/export/excel/', '/api/eco-fin/billing/export/csv/',
+            '/api/eco-fin/billing/export/pdf/',
+        ]
+        for url in urls:
+            for value in ('abc', '-1', '13'):
+                response = self.client.get(url, {'last_months': value})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (url, value))
+
+    def test_zero_means_all_months(self):
+        """last_months=0 nu filtrează."""
+        self.create_invoice(month=1, with_pdf=False, year=2020)
+        response = self.client.get('/api/eco-fin/billing/invoices/', {'last_months': '0'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get('/api/eco-fin/billing/invoices/', {'last_months': '3'})
+        self.assertEqual(len(response.data), 0)
+
+@mock.patch.dict(os.environ, {
+    'SMARTBILL_USERNAME': 'user@test.ro', 'SMARTBILL_TOKEN': 'token', 'SMARTBILL_COMPANY_CIF': 'RO1'
+})
+class SmartBillSessionTest(TestCase):
+    """Sesiunea HTTP a clientului SmartBill este per fir de execuție."""
+
+    def test_session_per_thread(self):
+        smartbill = SmartBillClient()
+        self.assertIs(smartbill.session, smartbill.session)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(smartbill.session))
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], smartbill.session)
@@ -24,6 +24,7 @@ from .billing_views import (
     BillingSyncViewSet,
     billing_report_summary,
     billing_export_excel,
+    billing_export_csv,
     billing_export_pdf,
 )
 
@@ -59,5 +60,6 @@ urlpatterns = [
     # Billing - Rapoarte și Export
     path('billing/reports/summary/', billing_report_summary, name='billing-report-summary'),
     path('billing/export/excel/', billing_export_excel, name='billing-export-excel'),
+    path('billing/export/csv/', billing_export_csv, name='billing-export-csv'),
     path('billing/export/pdf/', billing_export_pdf, name='billing-export-pdf'),
 ]
@@ -5,6 +5,7 @@ API endpoints pentru modulul de profitabilitate.
 from datetime import datetime
 from decimal import Decimal
 from django.db.models import Sum, Avg, Count, F, Q
+from django.db.models.functions import Upper
 from django.db import transaction
 from django.utils import timezone
 from django.http import HttpResponse
@@ -43,7 +44,8 @@ from .models import (
     EcoFinImportedRow, 
     EcoFinProcessedRecord, 
     EcoFinImportBatch,
-    EcoFinMonthlyReport  # Pentru compatibilitate
+    EcoFinMonthlyReport,  # Pentru compatibilitate
+    legacy_reports_readonly,
 )
 from .serializers import (
     EcoFinSettingsSerializer,
@@ -53,6 +55,7 @@ from .serializers import (
     EcoFinPreviewRowSerializer,
     EcoFinReportSummarySerializer,
     EcoFinMonthlyReportSerializer,  # Pentru compatibilitate
+    EcoFinMonthlyReportListSerializer,
 )
 
 
@@ -70,12 +73,20 @@ class IsManagementOrAdmin(permissions.BasePermission):
         return role in [UserRole.MANAGEMENT, UserRole.ADMIN]
 
 
+class LegacyReportsReadOnly(permissions.BasePermission):
+    """Cu ECOFIN_LEGACY_READONLY activ, rapoartele vechi pot fi doar citite."""
+    message = 'Rapoartele Eco-Fin vechi sunt doar-citire.'
+
+    def has_permission(self, request, view):
+        return request.method in permissions.SAFE_METHODS or not legacy_reports_readonly()
+
+
 class EcoFinSettingsViewSet(viewsets.ModelViewSet):
     """
     CRUD pentru setările globale Eco-Fin.
     Doar Management/Admin.
     """
-    queryset = EcoFinSettings.objects.all()
+    queryset = EcoFinSettings.objects.select_related('created_by')
     serializer_class = EcoFinSettingsSerializer
     permission_classes = [IsManagementOrAdmin]
 
@@ -92,6 +103,26 @@ class EcoFinSettingsViewSet(viewsets.ModelViewSet):
             )
         return super().update(request, *args, **kwargs)
 
+    def perform_update(self, serializer):
+        """
+        Înregistrările nevalidate ale lunii preiau noile setări și sunt
+        recalculate direct în baza de date (fără save() per înregistrare).
+        Cota indirectă se împarte, ca la import, doar la înregistrările nevalidate.
+        """
+        with transaction.atomic():
+            month_settings = serializer.save()
+            records = EcoFinProcessedRecord.objects.filter(
+                year=month_settings.year, month=month_settings.month, is_validated=False
+            )
+            workers_count = records.count()
+            if not workers_count:
+                return
+            records.update(
+                cost_concediu=month_settings.cost_concediu,
+                cota_indirecte=month_settings.cheltuieli_indirecte / workers_count
+            )
+            EcoFinProcessedRecord.recompute_sql(month_settings.year, month_settings.month)
+
     @action(detail=False, methods=['get'], url_path='current/(?P<year>[0-9]+)/(?P<month>[0-9]+)')
     def get_for_month(self, request, year=None, month=None):
         """Obține setările pentru o lună specifică."""
@@ -108,7 +139,7 @@ class EcoFinProcessedRecordViewSet(viewsets.ModelViewSet):
     CRUD pentru înregistrările procesate Eco-Fin.
     Doar Management/Admin pot crea/modifica.
     """
-    queryset = EcoFinProcessedRecord.objects.select_related('worker', 'client').all()
+    queryset = EcoFinProcessedRecord.for_listing()
     serializer_class = EcoFinProcessedRecordSerializer
     permission_classes = [IsManagementOrAdmin]
 
@@ -172,7 +203,16 @@ class EcoFinProcessedRecordViewSet(viewsets.ModelViewSet):
         """
         qs = self.get_queryset()
         
-        if not qs.exists():
+        # Calcule agregate (un set gol dă total_workers=0, fără un EXISTS separat)
+        totals = qs.aggregate(
+            total_workers=Count('id'),
+            total_hours=Sum('ore_lucrate'),
+            total_venit=Sum('venit_generat'),
+            total_costs=Sum('cost_salariat_total'),
+            total_profit=Sum('profitabilitate'),
+        )
+        
+        if not totals['total_workers']:
             return Response({
                 'total_workers': 0,
                 'total_hours': 0,
@@ -184,15 +224,6 @@ class EcoFinProcessedRecordViewSet(viewsets.ModelViewSet):
                 'by_client': []
             })
         
-        # Calcule agregate
-        totals = qs.aggregate(
-            total_workers=Count('id'),
-            total_hours=Sum('ore_lucrate'),
-            total_venit=Sum('venit_generat'),
-            total_costs=Sum('cost_salariat_total'),
-            total_profit=Sum('profitabilitate'),
-        )
-        
         # Profit margin
         profit_margin = 0
         if totals['total_venit'] and totals['total_venit'] > 0:
@@ -406,17 +437,33 @@ class EcoFinImportViewSet(viewsets.ViewSet):
             
             # Procesează rândurile
             preview_rows = []
+            imported_rows = []  # salvate la final într-un singur bulk_create
             matched_count = 0
-            error_count = 0
             
+            # Rândurile cu nr. CIM
+            sheet_rows = []
             for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-                # Citește nr_cim
                 nr_cim_val = row[col_nr_cim - 1].value if col_nr_cim else None
-                if not nr_cim_val:
-                    continue
-                
-                nr_cim = str(nr_cim_val).strip()
-                
+                if nr_cim_val:
+                    sheet_rows.append((row_idx, row, str(nr_cim_val).strip()))
+            
+            # Lucrătorii (cu clientul) pentru toate CIM-urile, într-un singur query;
+            # potrivire fără diferențe de majuscule, ca cim_nr__iexact
+            workers_by_cim = {}
+            matching_workers = Worker.objects.annotate(cim_upper=Upper('cim_nr')).filter(
+                cim_upper__in={nr_cim.upper() for _, _, nr_cim in sheet_rows}
+            ).select_related('client').only(
+                'id', 'nume', 'prenume', 'cim_nr', 'client',
+                'client__denumire', 'client__tarif_orar', 'client__cazare_cost',
+                'client__masa_cost', 'client__transport_cost'
+            ).order_by('pk')
+            for worker in matching_workers.iterator(chunk_size=2000):
+                workers_by_cim.setdefault(worker.cim_upper, worker)
+            
+            # Aceeași valoare pentru toate rândurile lunii
+            cost_concediu = float(settings.cost_concediu)
+            
+            for row_idx, row, nr_cim in sheet_rows:
                 # Citește celelalte valori
                 nume = str(row[col_nume - 1].value or '').strip() if col_nume else ''
                 prenume = str(row[col_prenume - 1].value or '').strip() if col_prenume else ''
@@ -431,7 +478,7 @@ class EcoFinImportViewSet(viewsets.ViewSet):
                 # Caută lucrătorul după nr_CIM
                 errors = []
                 warnings = []
-                worker = Worker.objects.filter(cim_nr__iexact=nr_cim).first()
+                worker = workers_by_cim.get(nr_cim.upper())
                 
                 is_matched = worker is not None
                 worker_nume_match = False
@@ -439,7 +486,6 @@ class EcoFinImportViewSet(viewsets.ViewSet):
                 
                 if not is_matched:
                     errors.append(f'Lucrător cu nr. CIM "{nr_cim}" nu a fost găsit.')
-                    error_count += 1
                 else:
                     # Verifică concordanța numelui
                     if nume and prenume:
@@ -457,7 +503,6 @@ class EcoFinImportViewSet(viewsets.ViewSet):
                     if not client:
                         errors.append('Lucrătorul nu are client asignat.')
                         is_matched = False
-                        error_count += 1
                     else:
                         matched_count += 1
                 
@@ -470,7 +515,6 @@ class EcoFinImportViewSet(viewsets.ViewSet):
                 # Calcule conform formulei
                 cost_salarial_complet = salariu_brut + cam
                 cota_indirecte = Decimal('0')  # Se calculează după ce știm câți sunt
-                cost_concediu = settings.cost_concediu
                 
                 preview_rows.append({
                     'row_number': row_idx,
@@ -497,7 +541,7 @@ class EcoFinImportViewSet(viewsets.ViewSet):
                     'cost_transport': float(cost_transport),
                     'cost_salarial_complet': float(cost_salarial_complet),
                     'cota_indirecte': 0,  # Se calculează după
-                    'cost_concediu': float(cost_concediu),
+                    'cost_concediu': cost_concediu,
                     'cost_salariat_total': 0,  # Se calculează după
                     'venit_estimat': 0,  # Se calculează după
                     'profitabilitate_estimata': 0,  # Se calculează după
@@ -505,6 +549,29 @@ class EcoFinImportViewSet(viewsets.ViewSet):
                     'errors': errors,
                     'warnings': warnings
                 })
+                
+                imported_rows.append(EcoFinImportedRow(
+                    row_number=row_idx,
+                    nr_cim=nr_cim[:50],
+                    nume=nume[:100],
+                    prenume=prenume[:100],
+                    salariu_brut=salariu_brut,
+                    ore_lucrate=ore_lucrate,
+                    brut1=brut1,
+                    net=net,
+                    retineri=retineri,
+                    rest_plata=rest_plata,
+                    cam=cam,
+                    status=(
+                        EcoFinImportedRow.Status.MATCHED if is_matched and client is not None
+                        else EcoFinImportedRow.Status.ERROR
+                    ),
+                    worker=worker,
+                    client=client,
+                    error_message='\n'.join(errors),
+                    year=year,
+                    month=month
+                ))
             
             # Calculăm cota indirecte per lucrător valid
             if matched_count > 0:
@@ -512,10 +579,12 @@ class EcoFinImportViewSet(viewsets.ViewSet):
             else:
                 cota_indirecte_per_worker = 0
             
-            # Actualizăm calculele pentru rândurile valide
+            # Actualizăm calculele pentru rândurile valide (float, doar pentru afișare;
+            # valorile salvate se recalculează în Decimal/SQL la procesare)
+            cota_indirecte_rotunjita = round(cota_indirecte_per_worker, 2)
             for row in preview_rows:
                 if row['is_valid']:
-                    row['cota_indirecte'] = round(cota_indirecte_per_worker, 2)
+                    row['cota_indirecte'] = cota_indirecte_rotunjita
                     
                     # Cost salariat total
                     cost_salariat_total = (
@@ -535,25 +604,28 @@ class EcoFinImportViewSet(viewsets.ViewSet):
                     # Profitabilitate
                     row['profitabilitate_estimata'] = round(venit - cost_salariat_total, 2)
             
-            # Creăm batch-ul de import
-            batch = EcoFinImportBatch.objects.create(
-                year=year,
-                month=month,
-                filename=file.name,
-                total_rows=len(preview_rows),
-                matched_rows=matched_count,
-                error_rows=error_count,
-                status=EcoFinImportBatch.Status.PREVIEW,
-                imported_by=request.user
-            )
+            # Creăm batch-ul de import și rândurile brute (INSERT-uri multi-rând sau COPY)
+            with transaction.atomic():
+                batch = EcoFinImportBatch.objects.create(
+                    year=year,
+                    month=month,
+                    filename=file.name,
+                    status=EcoFinImportBatch.Status.PREVIEW,
+                    imported_by=request.user
+                )
+                for imported_row in imported_rows:
+                    imported_row.batch = batch
+                EcoFinImportedRow.bulk_insert(imported_rows)
+                # Contoarele batch-ului vin din rândurile salvate
+                batch.refresh_stats()
             
             return Response({
                 'batch_id': batch.id,
                 'year': year,
                 'month': month,
-                'total_rows': len(preview_rows),
-                'matched_rows': matched_count,
-                'error_rows': error_count,
+                'total_rows': batch.total_rows,
+                'matched_rows': batch.matched_rows,
+                'error_rows': batch.error_rows,
                 'settings': {
                     'cheltuieli_indirecte': float(settings.cheltuieli_indirecte),
                     'cost_concediu': float(settings.cost_concediu),
@@ -586,34 +658,59 @@ class EcoFinImportViewSet(viewsets.ViewSet):
         year = int(year)
         month = int(month)
         
-        # Verifică setările
-        try:
-            settings = EcoFinSettings.objects.get(year=year, month=month)
-        except EcoFinSettings.DoesNotExist:
-            return Response({'detail': 'Setările pentru această lună nu există.'}, status=400)
-        
-        # Șterge înregistrările existente nevalidate pentru această lună
-        EcoFinProcessedRecord.objects.filter(
-            year=year, month=month, is_validated=False
-        ).delete()
-        
-        # Calculăm cota indirecte per lucrător
-        valid_rows = [r for r in rows if r.get('is_valid')]
-        valid_count = len(valid_rows)
-        cota_indirecte = float(settings.cheltuieli_indirecte) / valid_count if valid_count > 0 else 0
-        
-        created_records = []
-        errors = []
-        
+        # Rândul de setări al lunii e blocat până la final: importurile
+        # paralele pentru aceeași lună (și actualizarea setărilor) se
+        # execută pe rând, deci recitirea vede doar rândurile acestui import.
         with transaction.atomic():
+            # Verifică setările
+            try:
+                settings = EcoFinSettings.objects.select_for_update().get(year=year, month=month)
+            except EcoFinSettings.DoesNotExist:
+                return Response({'detail': 'Setările pentru această lună nu există.'}, status=400)
+            
+            # Șterge înregistrările existente nevalidate pentru această lună
+            EcoFinProcessedRecord.objects.filter(
+                year=year, month=month, is_validated=False
+            ).delete()
+            
+            # Calculăm cota indirecte per lucrător
+            valid_rows = [r for r in rows if r.get('is_valid')]
+            valid_count = len(valid_rows)
+            cota_indirecte = float(settings.cheltuieli_indirecte) / valid_count if valid_count > 0 else 0
+            
+            records = []
+            record_rows = []  # rândul din preview pentru fiecare înregistrare
+            errors = []
+            
+            # Lucrătorii și clienții necesari, câte un query pentru fiecare
+            worker_ids = set(
+                Worker.objects.filter(id__in={r.get('worker_id') for r in valid_rows})
+                .values_list('id', flat=True).iterator(chunk_size=2000)
+            )
+            clients = Client.objects.only(
+                'id', 'tarif_orar', 'cazare_cost', 'masa_cost', 'transport_cost'
+            ).in_bulk({r.get('client_id') for r in valid_rows})
+            
+            # Înregistrările validate rămân; nu pot fi dublate
+            taken = set(
+                EcoFinProcessedRecord.objects.filter(year=year, month=month)
+                .values_list('worker_id', 'client_id').iterator(chunk_size=2000)
+            )
+            
             for row in valid_rows:
                 try:
-                    worker = Worker.objects.get(id=row['worker_id'])
-                    client = Client.objects.get(id=row['client_id'])
-                    
-                    record = EcoFinProcessedRecord.objects.create(
-                        worker=worker,
-                        client=client,
+                    worker_id = int(row['worker_id'])
+                    if worker_id not in worker_ids:
+                        raise Worker.DoesNotExist('Worker matching query does not exist.')
+                    client = clients.get(int(row['client_id']))
+                    if client is None:
+                        raise Client.DoesNotExist('Client matching query does not exist.')
+                    if (worker_id, client.id) in taken:
+                        raise ValueError('Există deja o înregistrare pentru acest lucrător și client în luna selectată.')
+                
+                    record = EcoFinProcessedRecord(
+                        worker_id=worker_id,
+                        client_id=client.id,
                         year=year,
                         month=month,
                         nr_cim=row['nr_cim'],
@@ -633,29 +730,61 @@ class EcoFinImportViewSet(viewsets.ViewSet):
                         created_by=request.user,
                         notes=row.get('notes', '')
                     )
-                    # calculate_costs_and_profit() se apelează automat în save()
-                    created_records.append(record.id)
+                    records.append(record)
+                    record_rows.append(row)
+                    taken.add((worker_id, client.id))
                 except Exception as e:
                     errors.append({
                         'row': row.get('row_number'),
                         'nr_cim': row.get('nr_cim'),
                         'error': str(e)
                     })
+            
+            # bulk_create nu apelează save(): costurile se calculează apoi în SQL
+            # (un UPDATE pe înregistrările nevalidate ale lunii, adică cele noi).
+            # Dublurile create între timp în afara importului sunt ignorate, iar
+            # ignore_conflicts nu spune care rânduri au intrat: le recitim.
+            EcoFinProcessedRecord.objects.bulk_create(
+                records, batch_size=1000, ignore_conflicts=True
+            )
+            EcoFinProcessedRecord.recompute_sql(year, month)
+            inserted = set(
+                EcoFinProcessedRecord.objects.filter(
+                    year=year, month=month, is_validated=False, created_by=request.user
+                ).values_list('worker_id', 'client_id').iterator(chunk_size=2000)
+            )
+            
+        processed_row_numbers = []
+        for record, row in zip(records, record_rows):
+            if (record.worker_id, record.client_id) in inserted:
+                processed_row_numbers.append(row.get('row_number'))
+            else:
+                errors.append({
+                    'row': row.get('row_number'),
+                    'nr_cim': row.get('nr_cim'),
+                    'error': 'Există deja o înregistrare pentru acest lucrător și client în luna selectată.'
+                })
+        created_count = len(processed_row_numbers)
         
-        # Actualizează batch-ul
-        if batch_id:
-            EcoFinImportBatch.objects.filter(id=batch_id).update(
+        # Marchează rândurile importate procesate, apoi actualizează batch-ul
+        # (contoarele se recalculează din rânduri)
+        batch = EcoFinImportBatch.objects.filter(id=batch_id).only('id').first() if batch_id else None
+        if batch:
+            EcoFinImportedRow.objects.filter(
+                batch=batch, row_number__in=processed_row_numbers
+            ).update(status=EcoFinImportedRow.Status.PROCESSED)
+            EcoFinImportBatch.objects.filter(pk=batch.pk).update(
                 status=EcoFinImportBatch.Status.VALIDATED if not errors else EcoFinImportBatch.Status.FAILED,
-                processed_rows=len(created_records),
                 validated_by=request.user,
                 validated_at=timezone.now()
             )
+            batch.refresh_stats()
         
         return Response({
             'success': True,
-            'created_records': len(created_records),
+            'created_records': created_count,
             'errors': errors,
-            'message': f'Au fost create {len(created_records)} înregistrări pentru {month:02d}/{year}.'
+            'message': f'Au fost create {created_count} înregistrări pentru {month:02d}/{year}.'
         })
 
     @action(detail=False, methods=['get'], url_path='batches')
@@ -664,7 +793,7 @@ class EcoFinImportViewSet(viewsets.ViewSet):
         year = request.query_params.get('year')
         month = request.query_params.get('month')
         
-        batches = EcoFinImportBatch.objects.all()
+        batches = EcoFinImportBatch.objects.select_related('imported_by', 'validated_by')
         if year:
             batches = batches.filter(year=int(year))
         if month:
@@ -674,6 +803,18 @@ class EcoFinImportViewSet(viewsets.ViewSet):
         serializer = EcoFinImportBatchSerializer(batches, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='batches/(?P<batch_id>[0-9]+)')
+    def batch_detail(self, request, batch_id=None):
+        """Un batch de import cu rândurile lui din Excel."""
+        try:
+            batch = EcoFinImportBatch.get_with_rows(int(batch_id))
+        except EcoFinImportBatch.DoesNotExist:
+            return Response({'detail': 'Batch negăsit.'}, status=404)
+        
+        data = EcoFinImportBatchSerializer(batch).data
+        data['rows'] = EcoFinImportedRowSerializer(batch.rows.all(), many=True).data
+        return Response(data)
+
     @action(detail=False, methods=['get'], url_path='template')
     def download_template(self, request):
         """
@@ -793,10 +934,10 @@ def report_workers_by_client(request):
     if not year or not client_id:
         return Response({'detail': 'Year și client_id sunt obligatorii.'}, status=400)
     
-    qs = EcoFinProcessedRecord.objects.filter(
+    qs = EcoFinProcessedRecord.for_listing().filter(
         year=int(year),
         client_id=int(client_id)
-    ).select_related('worker', 'client')
+    )
     
     if month:
         qs = qs.filter(month=int(month))
@@ -1379,7 +1520,7 @@ def export_pdf(request):
         headers = ['Lucrător', 'Client', 'Ore', 'Salariu', 'CAM', 'Cost Total', 'Venit', 'Profit']
         data = [headers]
         
-        for record in qs:
+        for record in qs.iterator(chunk_size=2000):
             data.append([
                 f"{record.worker.nume} {record.worker.prenume}",
                 record.client.denumire,
@@ -1522,12 +1663,26 @@ class EcoFinMonthlyReportViewSet(viewsets.ModelViewSet):
     [DEPRECIAT] ViewSet pentru rapoartele lunare vechi.
     Folosiți EcoFinProcessedRecordViewSet în schimb.
     """
-    queryset = EcoFinMonthlyReport.objects.select_related('worker', 'client').all()
+    queryset = EcoFinMonthlyReport.objects.select_related(
+        'worker', 'client', 'validated_by', 'created_by'
+    ).all()
     serializer_class = EcoFinMonthlyReportSerializer
-    permission_classes = [IsManagementOrAdmin]
+    permission_classes = [IsManagementOrAdmin, LegacyReportsReadOnly]
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return EcoFinMonthlyReportListSerializer
+        return EcoFinMonthlyReportSerializer
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == 'list':
+            # Lista citește doar coloanele afișate (fără notes și costurile detaliate)
+            qs = qs.select_related(None).select_related('worker', 'client').only(
+                'id', 'worker', 'client', 'year', 'month',
+                'hours_worked', 'profit_brut', 'is_validated', 'created_at',
+                'worker__nume', 'worker__prenume', 'client__denumire'
+            )
         params = self.request.query_params
         
         year = params.get('year')
@@ -1547,7 +1702,20 @@ class EcoFinMonthlyReportViewSet(viewsets.ModelViewSet):
         """Sumar pentru compatibilitate."""
         qs = self.get_queryset()
         
-        if not qs.exists():
+        # Toate totalurile într-un singur SELECT agregat
+        totals = qs.aggregate(
+            total_workers=Count('id'),
+            total_hours=Sum('hours_worked'),
+            total_salary_cost=Sum('salary_cost'),
+            total_revenue=Sum(F('hours_worked') * F('tarif_orar')),
+            total_costs=Sum(
+                F('salary_cost') + F('cost_cazare') + F('cost_masa') +
+                F('cost_transport') + F('cost_concediu') + F('cheltuieli_indirecte')
+            ),
+            total_profit=Sum('profit_brut'),
+        )
+        
+        if not totals['total_workers']:
             return Response({
                 'total_workers': 0,
                 'total_hours': 0,
@@ -1559,20 +1727,6 @@ class EcoFinMonthlyReportViewSet(viewsets.ModelViewSet):
                 'by_client': []
             })
         
-        totals = qs.aggregate(
-            total_workers=Count('id'),
-            total_hours=Sum('hours_worked'),
-            total_salary_cost=Sum('salary_cost'),
-            total_profit=Sum('profit_brut'),
-        )
-        
-        total_revenue = sum(r.hours_worked * r.tarif_orar for r in qs)
-        total_costs = sum(
-            r.salary_cost + r.cost_cazare + r.cost_masa + 
-            r.cost_transport + r.cost_concediu + r.cheltuieli_indirecte
-            for r in qs
-        )
-        
         by_client = list(
             qs.values('client__id', 'client__denumire')
             .annotate(
@@ -1589,8 +1743,8 @@ class EcoFinMonthlyReportViewSet(viewsets.ModelViewSet):
             'total_workers': totals['total_workers'] or 0,
             'total_hours': float(totals['total_hours'] or 0),
             'total_salary_cost': float(totals['total_salary_cost'] or 0),
-            'total_revenue': float(total_revenue),
-            'total_costs': float(total_costs),
+            'total_revenue': float(totals['total_revenue'] or 0),
+            'total_costs': float(totals['total_costs'] or 0),
             'total_profit': float(totals['total_profit'] or 0),
             'average_profit_per_worker': float(avg_profit),
             'by_client': by_client
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-16 07:10
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iss', '0011_ambasada_worker_ambasada'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(django.db.models.functions.text.Upper('cim_nr'), name='iss_worker_cim_upper_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import User
 
 
@@ -240,6 +241,12 @@ class Worker(models.Model):
     # Path către folderul de documente (vom lega ulterior la storage S3/MinIO)
     folder_doc = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            # Importul Eco-Fin identifică lucrătorii după nr. CIM, fără majuscule
+            models.Index(Upper("cim_nr"), name="iss_worker_cim_upper_idx"),
+        ]
+
     def __str__(self):
         return f"{self.nume} {self.prenume} ({self.pasaport_nr})"
 
@@ -3,14 +3,18 @@ Suite de teste unitare pentru aplicația ISS Platform.
 Testează modelele, serializerele, view-urile și permisiunile.
 """
 
+import hashlib
 from decimal import Decimal
 from datetime import date, datetime
+from unittest import mock
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from rest_framework_simplejwt.views import TokenVerifyView
 
 from .models import Client, Worker, UserProfile, UserRole, WorkerStatus
 
@@ -94,20 +98,44 @@ class JWTAuthenticationTest(APITestCase):
         self.assertEqual(refresh_response.status_code, status.HTTP_200_OK)
         self.assertIn('access', refresh_response.data)
 
+    def verify_cache_key(self, token):
+        return 'jwt_verify:' + hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
     def test_verify_valid_token(self):
-        """Poate verifica un token valid."""
+        """Poate verifica un token valid; a doua verificare vine din cache."""
         # Obținem token
         token_response = self.client.post('/api/token/', {
             'username': 'jwt_test_user',
             'password': 'testpass123'
         })
         access_token = token_response.data['access']
-        
-        # Verificăm
-        verify_response = self.client.post('/api/token/verify/', {
-            'token': access_token
-        })
-        self.assertEqual(verify_response.status_code, status.HTTP_200_OK)
+        cache.delete(self.verify_cache_key(access_token))
+
+        with mock.patch.object(TokenVerifyView, 'post', autospec=True, side_effect=TokenVerifyView.post) as verify:
+            # Verificăm
+            verify_response = self.client.post('/api/token/verify/', {
+                'token': access_token
+            })
+            self.assertEqual(verify_response.status_code, status.HTTP_200_OK)
+            self.assertTrue(cache.get(self.verify_cache_key(access_token)))
+
+            # A doua verificare este servită din cache, fără decodare
+            verify_response = self.client.post('/api/token/verify/', {
+                'token': access_token
+            })
+            self.assertEqual(verify_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(verify.call_count, 1)
+
+    def test_verify_invalid_token(self):
+        """Token-urile invalide sunt respinse și nu sunt puse în cache."""
+        with mock.patch.object(TokenVerifyView, 'post', autospec=True, side_effect=TokenVerifyView.post) as verify:
+            for _ in range(2):
+                verify_response = self.client.post('/api/token/verify/', {
+                    'token': 'invalid_token_here'
+                })
+                self.assertEqual(verify_response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNone(cache.get(self.verify_cache_key('invalid_token_here')))
+        self.assertEqual(verify.call_count, 2)
 
     def test_current_user_endpoint(self):
         """Endpoint-ul /api/me/ returnează informațiile utilizatorului."""
@@ -1,9 +1,14 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.dateparse import parse_date
 from django.http import HttpResponse
 from django.db import models
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
+from rest_framework_simplejwt.views import TokenVerifyView
 from io import BytesIO
 import openpyxl
 from openpyxl import Workbook
@@ -32,6 +37,32 @@ def current_user(request):
     return Response(serializer.data)
 
 
+class CachedTokenVerifyView(TokenVerifyView):
+    """
+    Verificare JWT cu cache scurt pentru rezultatele pozitive.
+    Endpoint: POST /api/token/verify/
+
+    Token-urile valide sunt ținute minte JWT_VERIFY_CACHE_TTL secunde (cheie = hash-ul
+    token-ului), astfel încât verificările repetate nu mai decodează semnătura.
+    Token-urile invalide nu se pun în cache.
+    """
+
+    def post(self, request, *args, **kwargs):
+        token = request.data.get('token')
+        if not isinstance(token, str) or not token:
+            return super().post(request, *args, **kwargs)
+
+        cache_key = 'jwt_verify:' + hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+        if cache.get(cache_key):
+            return Response({}, status=status.HTTP_200_OK)
+
+        response = super().post(request, *args, **kwargs)
+        ttl = getattr(settings, 'JWT_VERIFY_CACHE_TTL', 5)
+        if response.status_code == status.HTTP_200_OK and ttl:
+            cache.set(cache_key, True, ttl)
+        return response
+
+
 class IsManagementOrReadOnly(permissions.BasePermission):
     """
     Permite full access Management/Admin.
@@ -255,6 +255,20 @@ function EcoFinBilling({ activeTab }) {
     }
   }
 
+  const handleExportCSV = async () => {
+    try {
+      const blob = await billingAPI.exportBillingCSV(invoiceFilters)
+      const url = window.URL.createObjectURL(blob)
+      const a = document.createElement('a')
+      a.href = url
+      a.download = `raport_facturare_${new Date().toISOString().slice(0,10)}.csv`
+      a.click()
+      window.URL.revokeObjectURL(url)
+    } catch (err) {
+      setError('Eroare la export')
+    }
+  }
+
   const handleExportPDF = async () => {
     try {
       const blob = await billingAPI.exportBillingPDF(invoiceFilters)
@@ -668,6 +682,9 @@ function EcoFinBilling({ activeTab }) {
             <button className="btn btn-secondary" onClick={handleExportExcel}>
               📊 Export Excel
             </button>
+            <button className="btn btn-secondary" onClick={handleExportCSV}>
+              📋 Export CSV
+            </button>
             <button className="btn btn-secondary" onClick={handleExportPDF}>
               📄 Export PDF
             </button>
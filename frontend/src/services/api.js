@@ -628,6 +628,17 @@ export const billingAPI = {
     return response.data
   },
 
+  exportBillingCSV: async (params = {}) => {
+    const queryParams = new URLSearchParams()
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') queryParams.append(key, value)
+    })
+    const response = await api.get(`/eco-fin/billing/export/csv/?${queryParams}`, {
+      responseType: 'blob'
+    })
+    return response.data
+  },
+
   exportBillingPDF: async (params = {}) => {
     const queryParams = new URLSearchParams()
     Object.entries(params).forEach(([key, value]) => {